@@ -0,0 +1,92 @@
+"""Benchmark CPU time per episode minute for the per-turn codec chain.
+
+"legacy" reproduces the previous Azure path: every turn is encoded to a
+192k MP3, decoded again for the merge and the episode is encoded once more.
+"single" keeps turns as PCM (optionally written as FLAC intermediates) and
+performs exactly one lossy encode. CPU time includes the ffmpeg child
+processes pydub spawns, so ffmpeg must be on PATH, and ffprobe too for the
+legacy path's MP3 decodes:
+
+    python -m benchmarks.bench_codec
+"""
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from src.components.podcast.assembler import (
+    SAMPLE_RATE,
+    assemble_pcm,
+    load_pcm,
+    pcm_to_segment,
+    save_pcm,
+)
+
+TURNS = 40
+TURN_SECONDS = 8
+
+
+def make_turns():
+    t = np.arange(SAMPLE_RATE * TURN_SECONDS) / SAMPLE_RATE
+    turns = []
+    for idx in range(TURNS):
+        tone = np.sin(2 * np.pi * (180 + idx * 7) * t) * np.sin(2 * np.pi * 3 * t)
+        noise = np.random.default_rng(idx).normal(0, 0.05, len(t))
+        turns.append(((tone + noise) * 8000).astype(np.int16).tobytes())
+    return turns
+
+
+def cpu_time() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def export_final(pcm, output_dir):
+    pcm_to_segment(pcm).export(
+        os.path.join(output_dir, "episode.mp3"),
+        format="mp3",
+        bitrate="192k",
+        parameters=["-acodec", "libmp3lame", "-q:a", "2"],
+    )
+
+
+def legacy(turns, output_dir):
+    chunks = []
+    for idx, pcm in enumerate(turns):
+        path = os.path.join(output_dir, f"turn_{idx}.mp3")
+        pcm_to_segment(pcm).export(path, format="mp3", bitrate="192k")
+        chunks.append(load_pcm(path))
+    export_final(assemble_pcm(chunks), output_dir)
+
+
+def single(turns, output_dir, intermediate_format=None):
+    for idx, pcm in enumerate(turns):
+        if intermediate_format:
+            path = os.path.join(output_dir, f"turn_{idx}.{intermediate_format}")
+            save_pcm(pcm, path, intermediate_format)
+    export_final(assemble_pcm(turns), output_dir)
+
+
+def measure(name, fn, turns, **kwargs):
+    with tempfile.TemporaryDirectory() as output_dir:
+        start_cpu, start_wall = cpu_time(), time.perf_counter()
+        fn(turns, output_dir, **kwargs)
+        cpu, wall = cpu_time() - start_cpu, time.perf_counter() - start_wall
+
+    minutes = TURNS * TURN_SECONDS / 60
+    print(f"{name:>14} {cpu / minutes:>14.2f} {wall / minutes:>15.2f}")
+
+
+def main():
+    turns = make_turns()
+    print(f"{'pipeline':>14} {'cpu s/min':>14} {'wall s/min':>15}")
+    measure("legacy mp3", legacy, turns)
+    measure("single (pcm)", single, turns)
+    measure("single (flac)", single, turns, intermediate_format="flac")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark episode assembly cost against the number of dialogue segments.
+
+Compares the previous ``merged = merged + silence + audio`` loop with the
+preallocated-buffer assembler. Segments are synthetic PCM so no decoder or
+network access is needed:
+
+    python -m benchmarks.bench_merge
+"""
+import os
+import time
+
+from pydub import AudioSegment
+
+from src.components.podcast.assembler import (
+    CHANNELS,
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    assemble_pcm,
+)
+
+SEGMENT_SECONDS = 6
+SEGMENT_COUNTS = [25, 50, 100, 200, 400]
+
+
+def make_segments(count: int):
+    frame_bytes = SAMPLE_WIDTH * CHANNELS
+    size = SAMPLE_RATE * SEGMENT_SECONDS * frame_bytes
+    return [os.urandom(size) for _ in range(count)]
+
+
+def merge_concat(chunks) -> AudioSegment:
+    merged = AudioSegment.empty()
+    for chunk in chunks:
+        audio = AudioSegment(
+            data=chunk,
+            sample_width=SAMPLE_WIDTH,
+            frame_rate=SAMPLE_RATE,
+            channels=CHANNELS,
+        )
+        if len(merged) > 0:
+            merged = merged + AudioSegment.silent(duration=500) + audio
+        else:
+            merged = audio
+    return merged
+
+
+def merge_preallocated(chunks) -> bytearray:
+    return assemble_pcm(chunks, pause_ms=500)
+
+
+def timed(fn, chunks) -> float:
+    start = time.perf_counter()
+    fn(chunks)
+    return time.perf_counter() - start
+
+
+def main():
+    print(
+        f"{'segments':>8} {'concat (s)':>12} {'prealloc (s)':>13} {'prealloc/seg (ms)':>18}"
+    )
+    for count in SEGMENT_COUNTS:
+        chunks = make_segments(count)
+        concat = timed(merge_concat, chunks)
+        prealloc = timed(merge_preallocated, chunks)
+        print(
+            f"{count:>8} {concat:>12.3f} {prealloc:>13.4f} "
+            f"{prealloc / count * 1000:>18.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
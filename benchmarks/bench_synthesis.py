@@ -0,0 +1,50 @@
+"""Benchmark synthesis throughput against worker count using the local TTS backend.
+
+No credentials or network are needed; latency and error rates come from
+LocalSpeechBackend's simulation settings:
+
+    python -m benchmarks.bench_synthesis
+"""
+import tempfile
+import time
+
+from src.components.podcast.podcast_generator import PodcastGenerator
+
+SCRIPT = "\n".join(
+    f"{speaker}: "
+    + " ".join(f"This is sentence {idx} of turn {turn}." for idx in range(4))
+    for turn, speaker in enumerate(["Host", "Learner", "Expert"] * 20)
+)
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+BACKEND_OPTIONS = {
+    "latency_distribution": "lognormal",
+    "latency_base": 0.2,
+    "rate_limit_rate": 0.02,
+}
+
+
+def main():
+    print(f"{'workers':>8} {'seconds':>9} {'segments/s':>11}")
+    for workers in WORKER_COUNTS:
+        with tempfile.TemporaryDirectory() as base_dir:
+            generator = PodcastGenerator(
+                service="local",
+                base_dir=base_dir,
+                max_workers=workers,
+                cache_max_mb=None,
+                backend_options=BACKEND_OPTIONS,
+            )
+            generator.output_dir = base_dir
+            jobs = generator._prepare_jobs(
+                [tuple(line.split(": ", 1)) for line in SCRIPT.splitlines()]
+            )
+
+            start = time.perf_counter()
+            generator._generate_audio_batch(jobs)
+            elapsed = time.perf_counter() - start
+
+        print(f"{workers:>8} {elapsed:>9.2f} {len(jobs) / elapsed:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Check that prompt building gives the same completion cache keys in every process.
+
+The LLM cache (and cassette replay) only hits across runs when each prompt
+is byte-identical. This builds the summary and planning prompts for a
+synthetic post in several interpreters with different hash seeds and
+compares their cache keys; no credentials or network access are needed:
+
+    python -m benchmarks.check_cache_keys
+"""
+import os
+import subprocess
+import sys
+
+from src.utils.cache import make_cache_key
+
+HASH_SEEDS = ["0", "1", "2", "3"]
+
+POST = {
+    "id": "abc123",
+    "title": "What's up with everyone linking the same five articles?",
+    "selftext": "Seen https://example.com/a and https://example.com/b everywhere.",
+    "url": "https://www.reddit.com/r/OutOfTheLoop/comments/abc123/",
+    "comments": [
+        {
+            "author": f"user{idx}",
+            "score": 10 - idx,
+            "body": f"Start at https://example.org/{idx} then https://example.com/a",
+        }
+        for idx in range(5)
+    ],
+}
+
+
+def cache_keys():
+    """Cache keys of the summary and plan prompts built in this process."""
+    from src.components.podcast.script_planner import ScriptPlanner
+    from src.components.reddit import RedditPostProcessor
+
+    # Prompt building needs no services, so skip their clients
+    processor = RedditPostProcessor.__new__(RedditPostProcessor)
+    planner = ScriptPlanner.__new__(ScriptPlanner)
+
+    urls = processor._collect_urls(POST)
+    url_content = {url: f"Scraped article at {url}. " * 20 for url in urls}
+    summary_prompt = processor._summary_prompt(POST, url_content)
+    processed = processor._post_content(POST, urls, url_content, "A summary.")
+    plan_prompt = planner._plan_prompt([processed])
+
+    return [
+        make_cache_key("deployment", prompt, 0.7, None, {})
+        for prompt in (summary_prompt, plan_prompt)
+    ]
+
+
+def main():
+    results = {}
+    for seed in HASH_SEEDS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.check_cache_keys", "--keys"],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results[seed] = output.strip().splitlines()[-2:]
+        print(f"PYTHONHASHSEED={seed}: {' '.join(key[:12] for key in results[seed])}")
+
+    if len({tuple(keys) for keys in results.values()}) != 1:
+        sys.exit("Cache keys differ between processes")
+    print("Cache keys identical across processes")
+
+
+if __name__ == "__main__":
+    if "--keys" in sys.argv:
+        print("\n".join(cache_keys()))
+    else:
+        main()
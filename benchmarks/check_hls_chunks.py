@@ -0,0 +1,98 @@
+"""Check that re-publishing an episode with one edited section only replaces its chunks.
+
+Publishes three synthetic sections as HLS, edits (and lengthens) a turn in
+the middle one and publishes again into the same chunk directory. The chunk
+URIs of the first and last sections must be unchanged, every chunk of the
+middle section must be new, and only those are encoded. Deleting the first
+playlist must then orphan exactly the replaced chunks. ffmpeg must be on
+PATH:
+
+    python -m benchmarks.check_hls_chunks
+"""
+import os
+import sys
+import tempfile
+from typing import List
+
+import numpy as np
+
+from src.components.podcast.assembler import SAMPLE_RATE
+from src.components.podcast.hls import HlsWriter, remove_orphaned_chunks
+
+CHUNK_SECONDS = 4
+# Turn lengths in seconds, per section
+SECTIONS = [[3.0, 5.5, 2.0], [4.0, 6.5, 3.5, 2.5], [5.0, 3.0]]
+
+
+def turn(seconds: float, seed: int) -> bytes:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    tone = np.sin(2 * np.pi * (150 + seed * 11) * t) * 8000
+    return tone.astype(np.int16).tobytes()
+
+
+def publish(playlist: str, chunk_dir: str, sections) -> HlsWriter:
+    writer = HlsWriter(playlist, chunk_dir=chunk_dir, chunk_seconds=CHUNK_SECONDS)
+    with writer:
+        for section in sections:
+            for idx, pcm in enumerate(section):
+                writer.write(pcm, section_start=idx == 0)
+    return writer
+
+
+def section_uris(playlist: str) -> List[List[str]]:
+    sections = [[]]
+    with open(playlist) as f:
+        for line in f:
+            line = line.strip()
+            if line == "#EXT-X-DISCONTINUITY":
+                sections.append([])
+            elif line and not line.startswith("#"):
+                sections[-1].append(os.path.basename(line))
+    return sections
+
+
+def main():
+    original = [
+        [turn(seconds, sec * 10 + idx) for idx, seconds in enumerate(section)]
+        for sec, section in enumerate(SECTIONS)
+    ]
+    edited = [list(section) for section in original]
+    edited[1][1] = turn(SECTIONS[1][1] + 1.3, 99)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        chunk_dir = os.path.join(base_dir, "hls_chunks")
+        first = os.path.join(base_dir, "first", "playlist.m3u8")
+        second = os.path.join(base_dir, "second", "playlist.m3u8")
+
+        publish(first, chunk_dir, original)
+        writer = publish(second, chunk_dir, edited)
+        before, after = section_uris(first), section_uris(second)
+        for name, uris in (("before", before), ("after", after)):
+            print(f"{name}: {[len(section) for section in uris]} chunks per section")
+
+        errors = []
+        if len(before) != len(SECTIONS) or len(after) != len(SECTIONS):
+            errors.append("Expected one discontinuity per section boundary")
+        if before[0] != after[0] or before[2] != after[2]:
+            errors.append("Chunks of unedited sections changed")
+        if set(before[1]) & set(after[1]):
+            errors.append("Edited section reused an old chunk")
+        if writer.encoded_chunks != len(after[1]):
+            errors.append(
+                f"Encoded {writer.encoded_chunks} chunks, "
+                f"expected {len(after[1])} for the edited section"
+            )
+
+        os.remove(first)
+        removed = remove_orphaned_chunks(chunk_dir, [second], min_age_seconds=0)
+        remaining = {name for name in os.listdir(chunk_dir) if name.endswith(".ts")}
+        if removed != len(before[1]) or remaining != {u for s in after for u in s}:
+            errors.append(f"Orphan cleanup removed {removed} chunks")
+
+    if errors:
+        sys.exit("\n".join(errors))
+    print("Only the edited section's chunks changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ image = (
         "elevenlabs",
         "azure-cognitiveservices-speech",
         "pydub",
+        "numpy",
         "langchain-openai",
         "langgraph",
     )
@@ -42,7 +43,7 @@ def generate_podcast():
 
     print(f"Starting podcast generation at {datetime.now()}")
 
-    agent = PodcastAgent(tts_service="elevenlabs", base_dir="/podcasts")
+    agent = PodcastAgent(tts_service="elevenlabs", base_dir="/podcasts", streaming=True)
 
     result = agent.run("OutOfTheLoop")
 
@@ -1,5 +1,8 @@
-from typing import Dict, List
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Send
 
@@ -10,58 +13,113 @@ from src.components.podcast import (
     ScriptPlanner,
 )
 from src.components.reddit import RedditPostFetcher, RedditPostProcessor
-from src.models.types import ProcessingState
+from src.models.types import PostContent, PostRef, ProcessingState
+from src.utils.artifacts import ArtifactStore, current_store
+from src.utils.script_parser import index_posts
+from src.utils.usage import UsageRecorder, current_recorder
 
 
 class PodcastAgent:
     """Agent for orchestrating the podcast generation process"""
 
-    def __init__(self, tts_service: str = "elevenlabs", base_dir: str = "./podcasts"):
+    def __init__(
+        self,
+        tts_service: str = "elevenlabs",
+        base_dir: str = "./podcasts",
+        tts_workers: int = 4,
+        post_concurrency: int = 16,
+        dialogue_concurrency: int = 8,
+        summary_batch_size: int = 1,
+        summary_batch_job: bool = False,
+        section_enhancement: bool = False,
+        **podcast_options: Any,
+    ):
         self.post_fetcher = RedditPostFetcher()
         self.post_processor = RedditPostProcessor()
         self.script_planner = ScriptPlanner()
         self.dialogue_generator = DialogueGenerator()
         self.script_enhancer = ScriptEnhancer()
         self.podcast_generator = PodcastGenerator(
-            service=tts_service, base_dir=base_dir
+            service=tts_service,
+            base_dir=base_dir,
+            max_workers=tts_workers,
+            **podcast_options,
         )
+        # Max in-flight branches per fan-out in the async workflow
+        self.post_concurrency = post_concurrency
+        self.dialogue_concurrency = dialogue_concurrency
+        # Posts summarized per completion, optionally through an offline batch
+        # job; otherwise each post is processed in its own fan-out branch
+        self.summary_batch_size = summary_batch_size
+        self.summary_batch_job = summary_batch_job
+        self.batch_summaries = summary_batch_size > 1 or summary_batch_job
+        # Enhance sections in parallel and stitch their boundaries, instead of
+        # rewriting the whole script in one completion
+        self.section_enhancement = section_enhancement
+        # Each run keeps its posts in a store under here while the workflow
+        # state carries only their keys, so fan-out branches and checkpoints
+        # don't copy scraped content
+        self.artifacts_dir = os.path.join(base_dir, ".artifacts")
         self.workflow = self._create_workflow()
+        self.async_workflow = self._create_workflow(asynchronous=True)
+
+    @property
+    def artifacts(self) -> ArtifactStore:
+        store = current_store.get()
+        if store is None:
+            raise RuntimeError("No artifact store; nodes only run inside run/arun")
+        return store
 
     def fetch_posts(self, state: ProcessingState) -> Dict:
         """Fetch top posts from subreddit."""
         posts = self.post_fetcher.fetch_top_posts(
             subreddit=state["subreddit"],
         )
-        return {"posts": posts}
+        return {"posts": [self.artifacts.put(post) for post in posts]}
 
     def process_post(self, state: ProcessingState) -> Dict:
         """Process a single post."""
-        return self.post_processor.process_post(state["post"])
+        post = self.post_processor.process_post(self.artifacts.get(state["post_key"]))
+        return {"processed_posts": [self._store_post(post)]}
+
+    def process_posts(self, state: ProcessingState) -> Dict:
+        """Process all posts with batched summaries."""
+        processed = self.post_processor.process_posts(
+            [self.artifacts.get(key) for key in state["posts"]],
+            batch_size=self.summary_batch_size,
+            batch_job=self.summary_batch_job,
+        )
+        return {"processed_posts": [self._store_post(post) for post in processed]}
 
     def generate_plan(self, state: ProcessingState) -> Dict:
         """Generate script plan from processed posts."""
-        plan, sections = self.script_planner.generate_plan(state["processed_posts"])
+        plan, sections = self.script_planner.generate_plan(
+            self._load_posts(state["processed_posts"])
+        )
         return {"script_plan": plan, "sections": sections}
 
     def generate_introduction(self, state: ProcessingState) -> Dict:
         """Generate podcast introduction."""
         intro = self.dialogue_generator.generate_introduction(
-            state["sections"], state["processed_posts"]
+            state["sections"], self._load_posts(state["processed_posts"])
         )
         return {"introduction": intro}
 
     def generate_dialogue(self, state: ProcessingState) -> Dict:
         """Generate dialogue for a section."""
         dialogue = self.dialogue_generator.generate_section_dialogue(
-            state["section"], state["processed_posts"]
+            state["section"], self._load_post(state["post_key"])
         )
         return {"dialogues": [dialogue]}
 
     def enhance_script(self, state: ProcessingState) -> Dict:
         """Enhance and format the final script."""
-        enhanced = self.script_enhancer.enhance_script(
-            state["introduction"], state.get("dialogues", [])
+        enhance = (
+            self.script_enhancer.enhance_script_sections
+            if self.section_enhancement
+            else self.script_enhancer.enhance_script
         )
+        enhanced = enhance(state["introduction"], state.get("dialogues", []))
         return {"final_script": enhanced}
 
     def generate_podcast(self, state: ProcessingState) -> Dict:
@@ -69,36 +127,112 @@ class PodcastAgent:
         audio_path = self.podcast_generator.generate_podcast(state["final_script"])
         return {"audio_path": audio_path}
 
+    async def afetch_posts(self, state: ProcessingState) -> Dict:
+        posts = await self.post_fetcher.afetch_top_posts(
+            subreddit=state["subreddit"],
+        )
+        return {"posts": [self.artifacts.put(post) for post in posts]}
+
+    async def aprocess_post(
+        self, state: ProcessingState, config: RunnableConfig
+    ) -> Dict:
+        async with config["configurable"]["post_limit"]:
+            post = await self.post_processor.aprocess_post(
+                self.artifacts.get(state["post_key"])
+            )
+        return {"processed_posts": [self._store_post(post)]}
+
+    async def aprocess_posts(self, state: ProcessingState) -> Dict:
+        # Batch jobs are polled with blocking waits, so run off the loop
+        return await asyncio.to_thread(self.process_posts, state)
+
+    async def agenerate_plan(self, state: ProcessingState) -> Dict:
+        plan, sections = await self.script_planner.agenerate_plan(
+            self._load_posts(state["processed_posts"])
+        )
+        return {"script_plan": plan, "sections": sections}
+
+    async def agenerate_introduction(self, state: ProcessingState) -> Dict:
+        intro = await self.dialogue_generator.agenerate_introduction(
+            state["sections"], self._load_posts(state["processed_posts"])
+        )
+        return {"introduction": intro}
+
+    async def agenerate_dialogue(
+        self, state: ProcessingState, config: RunnableConfig
+    ) -> Dict:
+        async with config["configurable"]["dialogue_limit"]:
+            dialogue = await self.dialogue_generator.agenerate_section_dialogue(
+                state["section"], self._load_post(state["post_key"])
+            )
+        return {"dialogues": [dialogue]}
+
+    async def aenhance_script(self, state: ProcessingState) -> Dict:
+        enhance = (
+            self.script_enhancer.aenhance_script_sections
+            if self.section_enhancement
+            else self.script_enhancer.aenhance_script
+        )
+        enhanced = await enhance(state["introduction"], state.get("dialogues", []))
+        return {"final_script": enhanced}
+
+    async def agenerate_podcast(self, state: ProcessingState) -> Dict:
+        audio_path = await self.podcast_generator.agenerate_podcast(
+            state["final_script"]
+        )
+        return {"audio_path": audio_path}
+
+    def _store_post(self, post: PostContent) -> PostRef:
+        return PostRef(id=post["id"], title=post["title"], key=self.artifacts.put(post))
+
+    def _load_post(self, key: Optional[str]) -> Optional[PostContent]:
+        return self.artifacts.get(key) if key else None
+
+    def _load_posts(self, refs: List[PostRef]) -> List[PostContent]:
+        return [self.artifacts.get(ref["key"]) for ref in refs]
+
     def map_to_post_processing(self, state: ProcessingState) -> List[Send]:
         """Map each post to parallel processing."""
-        return [Send("process_post", {"post": post}) for post in state["posts"]]
+        return [Send("process_post", {"post_key": key}) for key in state["posts"]]
 
     def map_to_dialogue_processing(self, state: ProcessingState) -> List[Send]:
-        """Map each section to parallel dialogue processing."""
-        return [
-            Send(
-                "generate_dialogue",
-                {"section": section, "processed_posts": state["processed_posts"]},
-            )
-            for section in state["sections"]
-        ]
+        """Map each section and its bound post to parallel dialogue processing.
+
+        Branches get the post's artifact key and load only that post.
+        """
+        refs = index_posts(state["processed_posts"])
+        sends = []
+        for section in state["sections"]:
+            ref = refs.get(section["post_id"])
+            payload = {"section": section, "post_key": ref["key"] if ref else None}
+            sends.append(Send("generate_dialogue", payload))
+        return sends
 
-    def _create_workflow(self) -> StateGraph:
+    def _create_workflow(self, asynchronous: bool = False) -> StateGraph:
+        """Build the graph from the node methods or their async ``a*`` variants."""
         workflow = StateGraph(ProcessingState)
 
-        workflow.add_node("fetch_posts", self.fetch_posts)
-        workflow.add_node("process_post", self.process_post)
-        workflow.add_node("generate_plan", self.generate_plan)
-        workflow.add_node("generate_introduction", self.generate_introduction)
-        workflow.add_node("generate_dialogue", self.generate_dialogue)
-        workflow.add_node("enhance_script", self.enhance_script)
-        workflow.add_node("generate_podcast", self.generate_podcast)
+        process = "process_posts" if self.batch_summaries else "process_post"
+        for name in [
+            "fetch_posts",
+            process,
+            "generate_plan",
+            "generate_introduction",
+            "generate_dialogue",
+            "enhance_script",
+            "generate_podcast",
+        ]:
+            node = getattr(self, f"a{name}" if asynchronous else name)
+            workflow.add_node(name, node)
 
         workflow.add_edge(START, "fetch_posts")
-        workflow.add_conditional_edges(
-            "fetch_posts", self.map_to_post_processing, ["process_post"]
-        )
-        workflow.add_edge("process_post", "generate_plan")
+        if self.batch_summaries:
+            workflow.add_edge("fetch_posts", "process_posts")
+        else:
+            workflow.add_conditional_edges(
+                "fetch_posts", self.map_to_post_processing, ["process_post"]
+            )
+        workflow.add_edge(process, "generate_plan")
         workflow.add_edge("generate_plan", "generate_introduction")
         workflow.add_conditional_edges(
             "generate_plan", self.map_to_dialogue_processing, ["generate_dialogue"]
@@ -109,6 +243,60 @@ class PodcastAgent:
 
         return workflow.compile()
 
+    def _report_llm_stats(self, usage: UsageRecorder, final_state: Dict) -> None:
+        """Print LLM usage per stage and write the reports next to the episode."""
+        print(f"\nLLM usage by stage:\n{usage.describe()}")
+        if final_state.get("audio_path"):
+            output_dir = os.path.dirname(final_state["audio_path"])
+            for path in usage.write_reports(output_dir):
+                print(f"LLM usage report: {path}")
+
+        # Components share one completion cache and governor per deployment
+        openai_service = self.script_planner.openai_service
+        if openai_service.cache_stats:
+            print(f"LLM cache: {openai_service.cache_stats}")
+        for deployment, stats in openai_service.governor_stats.items():
+            print(f"LLM rate governor ({deployment}): {stats}")
+
     def run(self, subreddit: str) -> Dict:
-        final_state = self.workflow.invoke({"subreddit": subreddit})
+        # Completions made during the run are recorded per pipeline stage
+        usage = UsageRecorder()
+        token = current_recorder.set(usage)
+        # Posts stay on disk until the run ends, then their store is deleted
+        with ArtifactStore.for_run(self.artifacts_dir) as artifacts:
+            store_token = current_store.set(artifacts)
+            try:
+                final_state = self.workflow.invoke({"subreddit": subreddit})
+            finally:
+                current_store.reset(store_token)
+                current_recorder.reset(token)
+
+        self._report_llm_stats(usage, final_state)
+        return final_state
+
+    async def arun(self, subreddit: str) -> Dict:
+        """Run the workflow on the event loop with async nodes and services.
+
+        Post processing and section dialogue fan out as concurrent tasks,
+        bounded by ``post_concurrency`` and ``dialogue_concurrency``.
+        """
+        config = {
+            "configurable": {
+                "post_limit": asyncio.Semaphore(self.post_concurrency),
+                "dialogue_limit": asyncio.Semaphore(self.dialogue_concurrency),
+            }
+        }
+        usage = UsageRecorder()
+        token = current_recorder.set(usage)
+        with ArtifactStore.for_run(self.artifacts_dir) as artifacts:
+            store_token = current_store.set(artifacts)
+            try:
+                final_state = await self.async_workflow.ainvoke(
+                    {"subreddit": subreddit}, config=config
+                )
+            finally:
+                current_store.reset(store_token)
+                current_recorder.reset(token)
+
+        self._report_llm_stats(usage, final_state)
         return final_state
@@ -0,0 +1,184 @@
+import io
+import os
+import subprocess
+from typing import TYPE_CHECKING, List, Optional
+
+# pydub is imported lazily so importing the pipeline doesn't pay for it
+if TYPE_CHECKING:
+    from pydub import AudioSegment
+
+# Common PCM format used for every segment before assembly
+SAMPLE_RATE = 24000
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+
+# Default silence between speaker turns, and between chunks of one split turn
+TURN_PAUSE_MS = 500
+CONTINUATION_PAUSE_MS = 150
+
+
+def ffmpeg_converter() -> str:
+    """Path of the ffmpeg binary pydub is configured to use."""
+    from pydub import AudioSegment
+
+    return AudioSegment.converter
+
+
+def to_pcm(audio: "AudioSegment") -> bytes:
+    """Convert an AudioSegment to raw PCM in the common assembly format."""
+    return (
+        audio.set_frame_rate(SAMPLE_RATE)
+        .set_channels(CHANNELS)
+        .set_sample_width(SAMPLE_WIDTH)
+        .raw_data
+    )
+
+
+def load_pcm(path: str) -> bytes:
+    """Decode an audio file to raw PCM in the common assembly format."""
+    from pydub import AudioSegment
+
+    return to_pcm(AudioSegment.from_file(path))
+
+
+def decode_pcm(data: bytes, format: str) -> bytes:
+    """Decode in-memory encoded audio (e.g. "mp3") to PCM in the common format."""
+    from pydub import AudioSegment
+
+    return to_pcm(AudioSegment.from_file(io.BytesIO(data), format=format))
+
+
+def pcm_duration_ms(num_bytes: int) -> float:
+    return num_bytes / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS) * 1000
+
+
+def pause_bytes(pause_ms: int) -> int:
+    """Size in bytes of a silent gap, aligned to whole frames."""
+    frames = int(SAMPLE_RATE * pause_ms / 1000)
+    return frames * SAMPLE_WIDTH * CHANNELS
+
+
+def assemble_pcm(
+    chunks: List[bytes],
+    pause_ms: int = TURN_PAUSE_MS,
+    pauses: Optional[List[int]] = None,
+) -> bytearray:
+    """Join PCM chunks with silent gaps into one preallocated buffer.
+
+    ``pauses[i]`` overrides the gap inserted before chunk ``i``. Every byte is
+    copied exactly once, so the cost is linear in the total episode length
+    rather than quadratic in the number of segments.
+    """
+    if pauses is None:
+        pauses = [pause_ms] * len(chunks)
+    gaps = [pause_bytes(pause) for pause in pauses]
+    total = sum(len(chunk) for chunk in chunks) + sum(gaps[1:])
+
+    # bytearray(n) is zero-filled, which is digital silence for signed PCM
+    buffer = bytearray(total)
+    view = memoryview(buffer)
+    offset = 0
+    for idx, chunk in enumerate(chunks):
+        if idx:
+            offset += gaps[idx]
+        view[offset : offset + len(chunk)] = chunk
+        offset += len(chunk)
+
+    return buffer
+
+
+def pcm_to_segment(pcm: bytes) -> "AudioSegment":
+    from pydub import AudioSegment
+
+    return AudioSegment(
+        data=bytes(pcm),
+        sample_width=SAMPLE_WIDTH,
+        frame_rate=SAMPLE_RATE,
+        channels=CHANNELS,
+    )
+
+
+def save_pcm(pcm: bytes, path: str, format: str = "pcm") -> str:
+    """Save PCM losslessly, either raw or as FLAC."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if format == "pcm":
+        with open(path, "wb") as f:
+            f.write(pcm)
+    elif format == "flac":
+        pcm_to_segment(pcm).export(path, format="flac")
+    else:
+        raise ValueError(f"Unsupported intermediate format: {format}")
+    return path
+
+
+class StreamingMp3Encoder:
+    """Encode PCM segments to an MP3 file incrementally through one ffmpeg process.
+
+    Segments are piped to the encoder as soon as they are written, so memory
+    use is bounded by the pipe buffer rather than by the episode length.
+    """
+
+    def __init__(
+        self, output_file: str, pause_ms: int = TURN_PAUSE_MS, bitrate: str = "192k"
+    ):
+        self.output_file = output_file
+        self.pause_ms = pause_ms
+        self.bitrate = bitrate
+        self.duration_ms = 0.0
+        self.segments = 0
+        self._process = None
+
+    def __enter__(self) -> "StreamingMp3Encoder":
+        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+        command = [
+            ffmpeg_converter(),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            str(SAMPLE_RATE),
+            "-ac",
+            str(CHANNELS),
+            "-i",
+            "pipe:0",
+            "-acodec",
+            "libmp3lame",
+            "-b:a",
+            self.bitrate,
+            "-q:a",
+            "2",
+            self.output_file,
+        ]
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        return self
+
+    def write(self, pcm: bytes, pause_ms: Optional[int] = None) -> None:
+        """Append a segment, preceded by a pause if it is not the first one."""
+        if self.segments:
+            gap = pause_bytes(self.pause_ms if pause_ms is None else pause_ms)
+            self._process.stdin.write(bytes(gap))
+            self.duration_ms += pcm_duration_ms(gap)
+
+        self._process.stdin.write(pcm)
+        self.duration_ms += pcm_duration_ms(len(pcm))
+        self.segments += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._process.kill()
+            self._process.wait()
+            return
+
+        _, stderr = self._process.communicate()
+        if self._process.returncode != 0:
+            raise Exception(
+                f"MP3 encoding failed for {self.output_file}: "
+                f"{stderr.decode(errors='replace').strip()}"
+            )
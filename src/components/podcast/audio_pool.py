@@ -0,0 +1,52 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from src.components.podcast.assembler import decode_pcm, save_pcm
+from src.components.podcast.postprocess import PostProcessingConfig, process_segment
+
+
+def create_audio_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for per-segment codec and post-processing work.
+
+    Workers are not forked from this process, which is already running
+    synthesis threads and provider SDK connections. Where available they are
+    forked from a clean fork server that has imported this module once, so
+    each worker starts without paying for the imports again. The workers are
+    started immediately, letting their startup overlap the first requests.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    for _ in range(workers):
+        pool.submit(_warm_up)
+    return pool
+
+
+def _warm_up() -> None:
+    pass
+
+
+def prepare_segment(
+    audio: bytes,
+    source_format: Optional[str] = None,
+    post_processing: Optional[PostProcessingConfig] = None,
+    intermediate_path: Optional[str] = None,
+    intermediate_format: Optional[str] = None,
+) -> Tuple[Optional[bytes], bytes]:
+    """Decode, save and post-process one segment; runs in a pool worker.
+
+    Only raw bytes cross the process boundary. Returns the decoded PCM (None
+    when ``audio`` was PCM already, so it isn't sent back) and the PCM ready
+    for assembly.
+    """
+    pcm = decode_pcm(audio, source_format) if source_format else audio
+    if intermediate_path:
+        save_pcm(pcm, intermediate_path, intermediate_format)
+    ready = process_segment(pcm, post_processing) if post_processing else pcm
+    decoded = pcm if source_format else None
+    return decoded, ready
@@ -1,28 +1,41 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from src.components.base import BaseComponent
 from src.models.types import Section
 from src.prompts.dialogue import INTRODUCTION_PROMPT, SECTION_DIALOGUE_PROMPT
-from src.utils.formatting import format_comments, format_url_content
+from src.utils.context import PackedContext, pack_posts, report_prompt
+from src.utils.formatting import format_post_context
+from src.utils.script_parser import index_posts
 
 
 class DialogueGenerator(BaseComponent):
     """Component for generating podcast dialogue."""
 
+    # Token budget for the matching post's context in each section prompt
+    context_tokens = 2500
+
     def generate_introduction(
         self, sections: List[Section], processed_posts: List[Dict]
     ) -> str:
         """Generate the podcast introduction."""
+        return self.openai_service.generate_completion(
+            self._introduction_prompt(sections, processed_posts), stage="introduction"
+        )
+
+    async def agenerate_introduction(
+        self, sections: List[Section], processed_posts: List[Dict]
+    ) -> str:
+        return await self.openai_service.agenerate_completion(
+            self._introduction_prompt(sections, processed_posts), stage="introduction"
+        )
+
+    def _introduction_prompt(
+        self, sections: List[Section], processed_posts: List[Dict]
+    ) -> str:
+        posts = index_posts(processed_posts)
         context_parts = []
         for section in sections:
-            matching_post = next(
-                (
-                    post
-                    for post in processed_posts
-                    if section["title"].lower() in post["title"].lower()
-                ),
-                None,
-            )
+            matching_post = posts.get(section["post_id"])
             if matching_post:
                 context_parts.append(
                     f"""
@@ -31,42 +44,36 @@ class DialogueGenerator(BaseComponent):
                 )
 
         context = "\n\n".join(context_parts)
-        return self.openai_service.generate_completion(
-            INTRODUCTION_PROMPT.format(context=context)
-        )
+        return INTRODUCTION_PROMPT.format(context=context)
 
     def generate_section_dialogue(
-        self, section: Section, processed_posts: List[Dict]
+        self, section: Section, post: Optional[Dict]
     ) -> Dict[str, str]:
-        """Generate dialogue for a single section."""
-        matching_post = next(
-            (
-                post
-                for post in processed_posts
-                if section["title"].lower() in post["title"].lower()
-            ),
-            None,
+        """Generate dialogue for a single section from the post it is bound to."""
+        dialogue = self.openai_service.generate_completion(
+            self._section_prompt(section, post), stage="section_dialogue"
         )
+        return {"dialogue": dialogue}
 
-        additional_context = ""
-        if matching_post:
-            additional_context = f"""
-            Relevant Context:
-            Title: {matching_post['title']}
-            Summary: {matching_post['summary']}
-
-            Key URLs and their content:
-            {format_url_content(matching_post['url_content'])}
+    async def agenerate_section_dialogue(
+        self, section: Section, post: Optional[Dict]
+    ) -> Dict[str, str]:
+        dialogue = await self.openai_service.agenerate_completion(
+            self._section_prompt(section, post), stage="section_dialogue"
+        )
+        return {"dialogue": dialogue}
 
-            Top Comments:
-            {format_comments(matching_post['comments'])}
-            """
+    def _section_prompt(self, section: Section, post: Optional[Dict]) -> str:
+        additional_context = ""
+        packed = PackedContext(budget=0)
+        if post:
+            packed = pack_posts([post], self.context_tokens)
+            additional_context = format_post_context(post, packed)
 
-        dialogue = self.openai_service.generate_completion(
-            SECTION_DIALOGUE_PROMPT.format(
-                title=section["title"],
-                points="\n".join(f"- {point}" for point in section["points"]),
-                context=additional_context,
-            )
+        prompt = SECTION_DIALOGUE_PROMPT.format(
+            title=section["title"],
+            points="\n".join(f"- {point}" for point in section["points"]),
+            context=additional_context,
         )
-        return {"dialogue": dialogue}
+        report_prompt(f"Dialogue '{section['title']}'", prompt, packed)
+        return prompt
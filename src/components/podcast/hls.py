@@ -0,0 +1,283 @@
+import csv
+import glob
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from src.components.podcast.assembler import (
+    CHANNELS,
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    TURN_PAUSE_MS,
+    ffmpeg_converter,
+    pause_bytes,
+    pcm_duration_ms,
+)
+
+
+class HlsWriter:
+    """Write an episode as AAC/MPEG-TS chunks plus an HLS playlist while it is assembled.
+
+    Audio is grouped into sections, started by ``write(..., section_start=True)``
+    (the script's section breaks) or, for scripts without breaks, at the
+    first segment boundary after ``max_section_seconds``. Each section is
+    padded with silence to a whole number of ``chunk_seconds`` chunks and
+    encoded by one continuous ffmpeg run that cuts it into chunks, so chunks
+    only carry a discontinuity (and encoder priming) at section boundaries.
+
+    Chunk files are named after a hash of their section's PCM and are only
+    encoded if missing, so re-publishing an episode with one corrected
+    section re-encodes just that section's chunks. The playlist is rewritten
+    after every section, letting players start on the first minutes while
+    later sections are still being synthesized.
+    """
+
+    def __init__(
+        self,
+        playlist_path: str,
+        chunk_dir: Optional[str] = None,
+        chunk_seconds: float = 10.0,
+        pause_ms: int = TURN_PAUSE_MS,
+        bitrate: str = "128k",
+        max_section_seconds: float = 300.0,
+    ):
+        self.playlist_path = playlist_path
+        self.chunk_dir = chunk_dir or os.path.dirname(playlist_path)
+        self.chunk_seconds = chunk_seconds
+        self.pause_ms = pause_ms
+        self.bitrate = bitrate
+        self.max_section_seconds = max_section_seconds
+        self.chunk_bytes = (
+            max(round(chunk_seconds * SAMPLE_RATE), 1) * SAMPLE_WIDTH * CHANNELS
+        )
+        self.duration_ms = 0.0
+        self.segments = 0
+        self.encoded_chunks = 0
+        self._buffer = bytearray()
+        # (path, duration) of each chunk, grouped by section
+        self.sections: List[List[Tuple[str, float]]] = []
+
+    @property
+    def chunks(self) -> List[Tuple[str, float]]:
+        return [chunk for section in self.sections for chunk in section]
+
+    def __enter__(self) -> "HlsWriter":
+        os.makedirs(os.path.dirname(self.playlist_path), exist_ok=True)
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        return self
+
+    def write(
+        self, pcm: bytes, pause_ms: Optional[int] = None, section_start: bool = False
+    ) -> None:
+        """Append a segment, preceded by a pause if it is not the first one."""
+        if section_start:
+            self._flush()
+
+        if self.segments:
+            gap = pause_bytes(self.pause_ms if pause_ms is None else pause_ms)
+            self._buffer.extend(bytes(gap))
+            self.duration_ms += pcm_duration_ms(gap)
+
+        self._buffer.extend(pcm)
+        self.duration_ms += pcm_duration_ms(len(pcm))
+        self.segments += 1
+
+        if pcm_duration_ms(len(self._buffer)) / 1000 >= self.max_section_seconds:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Encode the buffered section (unless already encoded) and publish it."""
+        if not self._buffer:
+            return
+
+        # Pad to whole chunks so every chunk has the target duration
+        padding = -len(self._buffer) % self.chunk_bytes
+        data = bytes(self._buffer) + bytes(padding)
+        self._buffer = bytearray()
+
+        digest = hashlib.sha256(data)
+        digest.update(f"{self.chunk_seconds}:{self.bitrate}".encode())
+        key = digest.hexdigest()[:16]
+        manifest_path = os.path.join(self.chunk_dir, f"section_{key}.json")
+
+        chunks = self._load_manifest(manifest_path)
+        if chunks is None:
+            chunks = self._encode_section(data, key, manifest_path)
+            self.encoded_chunks += len(chunks)
+
+        self.sections.append(
+            [
+                (os.path.join(self.chunk_dir, name), duration)
+                for name, duration in chunks
+            ]
+        )
+        self._write_playlist(final=False)
+
+    def _load_manifest(self, path: str) -> Optional[List[Tuple[str, float]]]:
+        """Chunks of an already encoded section, or None if any are missing."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            chunks = [(name, duration) for name, duration in json.load(f)]
+        if not all(os.path.exists(os.path.join(self.chunk_dir, n)) for n, _ in chunks):
+            return None
+        return chunks
+
+    def _encode_section(
+        self, data: bytes, key: str, manifest_path: str
+    ) -> List[Tuple[str, float]]:
+        count = len(data) // self.chunk_bytes
+        chunk_seconds = pcm_duration_ms(self.chunk_bytes) / 1000
+        if count > 1:
+            cuts = ["-segment_times"]
+            cuts.append(
+                ",".join(f"{chunk_seconds * idx:.6f}" for idx in range(1, count))
+            )
+        else:
+            cuts = ["-segment_time", str(math.ceil(chunk_seconds) + 1)]
+
+        # Chunks are written to a scratch directory and moved into place, then
+        # the manifest marks the section complete
+        tmp_dir = tempfile.mkdtemp(prefix=f"section_{key}.", dir=self.chunk_dir)
+        try:
+            list_path = os.path.join(tmp_dir, "chunks.csv")
+            command = [
+                ffmpeg_converter(),
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "s16le",
+                "-ar",
+                str(SAMPLE_RATE),
+                "-ac",
+                str(CHANNELS),
+                "-i",
+                "pipe:0",
+                "-c:a",
+                "aac",
+                "-b:a",
+                self.bitrate,
+                "-f",
+                "segment",
+                *cuts,
+                "-segment_format",
+                "mpegts",
+                "-segment_list",
+                list_path,
+                "-segment_list_type",
+                "csv",
+                os.path.join(tmp_dir, f"chunk_{key}_%03d.ts"),
+            ]
+            result = subprocess.run(command, input=data, capture_output=True)
+            if result.returncode != 0:
+                raise Exception(
+                    f"HLS section encoding failed for {key}: "
+                    f"{result.stderr.decode(errors='replace').strip()}"
+                )
+
+            with open(list_path, newline="") as f:
+                chunks = [
+                    (name, float(end) - float(start))
+                    for name, start, end in csv.reader(f)
+                ]
+            for name, _ in chunks:
+                os.replace(
+                    os.path.join(tmp_dir, name), os.path.join(self.chunk_dir, name)
+                )
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(chunks, f)
+        os.replace(tmp_path, manifest_path)
+        return chunks
+
+    def _write_playlist(self, final: bool) -> None:
+        playlist_dir = os.path.dirname(self.playlist_path)
+        # Chunks last chunk_seconds give or take an AAC frame, so the target
+        # is fixed for the whole stream
+        target = math.ceil(pcm_duration_ms(self.chunk_bytes) / 1000)
+
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+        ]
+        for idx, section in enumerate(self.sections):
+            # Each section is a separate encode with its own timestamps
+            if idx:
+                lines.append("#EXT-X-DISCONTINUITY")
+            for path, duration in section:
+                lines.append(f"#EXTINF:{duration:.3f},")
+                lines.append(os.path.relpath(path, playlist_dir))
+        if final:
+            lines.append("#EXT-X-ENDLIST")
+
+        tmp_path = f"{self.playlist_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.playlist_path)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            return
+        self._flush()
+        self._write_playlist(final=True)
+
+
+def playlist_chunks(playlist_path: str) -> List[str]:
+    """Absolute paths of the chunks a playlist references, in order."""
+    playlist_dir = os.path.dirname(playlist_path)
+    with open(playlist_path) as f:
+        return [
+            os.path.normpath(os.path.join(playlist_dir, line.strip()))
+            for line in f
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def remove_orphaned_chunks(
+    chunk_dir: str, playlists: Iterable[str], min_age_seconds: float = 3600.0
+) -> int:
+    """Delete chunk files (and section manifests) no playlist references.
+
+    Files younger than ``min_age_seconds`` are kept, as they may belong to
+    a section another run is still publishing. Returns the number of chunks
+    removed.
+    """
+    referenced = set()
+    for playlist in playlists:
+        referenced.update(playlist_chunks(playlist))
+
+    cutoff = time.time() - min_age_seconds
+    removed = 0
+    for path in glob.glob(os.path.join(chunk_dir, "chunk_*.ts")):
+        if os.path.normpath(path) not in referenced and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+
+    # Manifests of sections that lost a chunk, and scratch files of
+    # interrupted encodes
+    for path in glob.glob(os.path.join(chunk_dir, "section_*")):
+        if os.path.getmtime(path) >= cutoff:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif not path.endswith(".json"):
+            os.remove(path)
+        else:
+            with open(path) as f:
+                names = [name for name, _ in json.load(f)]
+            if not all(os.path.exists(os.path.join(chunk_dir, n)) for n in names):
+                os.remove(path)
+    return removed
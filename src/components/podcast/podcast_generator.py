@@ -1,206 +1,457 @@
+import asyncio
 import datetime
+import glob
 import os
 import re
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
-
-import azure.cognitiveservices.speech as speechsdk
-from elevenlabs import Voice, VoiceSettings, save
-from elevenlabs.client import ElevenLabs
-from pydub import AudioSegment
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from src.components.podcast.assembler import (
+    CONTINUATION_PAUSE_MS,
+    SAMPLE_RATE,
+    TURN_PAUSE_MS,
+    StreamingMp3Encoder,
+    assemble_pcm,
+    pcm_duration_ms,
+    pcm_to_segment,
+    save_pcm,
+)
+from src.components.podcast.audio_pool import create_audio_pool, prepare_segment
+from src.components.podcast.hls import HlsWriter, remove_orphaned_chunks
+from src.components.podcast.postprocess import (
+    DEFAULT_POST_PROCESSING,
+    PostProcessingConfig,
+    process_episode,
+    process_segment,
+)
+from src.components.podcast.tts import (
+    TTSRateLimitError,
+    create_backend,
+    get_backend_spec,
+    get_speaker_configs,
+)
+from src.components.podcast.tts.ssml import pack_ssml_batches
+from src.utils.cache import DiskCache, make_cache_key
+from src.utils.cassette import get_cassette
+from src.utils.rate_limit import RateLimiter
+from src.utils.script_parser import split_sections
+from src.utils.segmenter import Turn, segment_turns
 
 
 @dataclass
-class AzureSpeakerConfig:
-    voice_name: str
-    style: str = "chat"
-    style_degree: float = 1.0
-
+class SynthesisJob:
+    index: int
+    turns: List[Turn]
+    # Script section the job belongs to; jobs never span two sections
+    section: int = 0
+    # Silence before the job's audio
+    pause_before_ms: int = TURN_PAUSE_MS
 
-@dataclass
-class ElevenLabsSpeakerConfig:
-    voice_id: str
-    model_id: str = "eleven_monolingual_v1"
-    stability: float = 0.5
-    similarity_boost: float = 0.75
-    style: float = 0.0
-    use_speaker_boost: bool = True
-
-
-AZURE_SPEAKER_CONFIGS = {
-    "Host": AzureSpeakerConfig(voice_name="en-US-JasonNeural", style="chat"),
-    "Learner": AzureSpeakerConfig(voice_name="en-US-JennyNeural", style="friendly"),
-    "Expert": AzureSpeakerConfig(voice_name="en-US-GuyNeural", style="professional"),
-}
-
-ELEVEN_LABS_SPEAKER_CONFIGS = {
-    "Host": ElevenLabsSpeakerConfig(
-        voice_id="cjVigY5qzO86Huf0OWal",
-        stability=0.75,
-        similarity_boost=0.75,
-        style=0.35,
-        use_speaker_boost=True,
-    ),
-    "Learner": ElevenLabsSpeakerConfig(
-        voice_id="cgSgspJ2msm6clMCkdW9",
-        stability=0.65,
-        similarity_boost=0.70,
-        style=0.45,
-        use_speaker_boost=True,
-    ),
-    "Expert": ElevenLabsSpeakerConfig(
-        voice_id="onwK4e9ZLuTAKqWW03F9",
-        stability=0.85,
-        similarity_boost=0.80,
-        style=0.25,
-        use_speaker_boost=True,
-    ),
-}
+    @property
+    def label(self) -> str:
+        return "/".join(dict.fromkeys(turn.speaker for turn in self.turns))
 
 
 class PodcastGenerator:
-    def __init__(self, service: str = "azure", base_dir: Optional[str] = "./podcasts"):
+    def __init__(
+        self,
+        service: str = "azure",
+        base_dir: Optional[str] = "./podcasts",
+        max_workers: int = 4,
+        requests_per_minute: Optional[float] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_mb: Optional[int] = 512,
+        streaming: bool = False,
+        ssml_batching: bool = False,
+        segment_max_chars: Optional[int] = 600,
+        segment_min_chars: int = 40,
+        post_processing: Optional[PostProcessingConfig] = DEFAULT_POST_PROCESSING,
+        hls_chunk_seconds: Optional[float] = None,
+        intermediate_format: Optional[str] = None,
+        backend_options: Optional[Dict[str, Any]] = None,
+        audio_workers: Optional[int] = None,
+        turn_pause_ms: int = TURN_PAUSE_MS,
+        continuation_pause_ms: int = CONTINUATION_PAUSE_MS,
+    ):
+        spec = get_backend_spec(service)
         self.base_dir = base_dir
         self.service = service
+        self.max_workers = max(1, max_workers)
+        self.streaming = streaming
+        # Multi-turn batching only applies to backends that support it
+        self.ssml_batching = ssml_batching and spec.supports_batching
+        # Turns are re-segmented into this size band; None keeps the script turns
+        self.segment_max_chars = segment_max_chars
+        self.segment_min_chars = segment_min_chars
+        # Loudness normalization and silence trimming; None leaves audio untouched
+        self.post_processing = post_processing
+        # Silence between speaker turns, and between chunks of one split turn;
+        # every output path (merge, streaming MP3, HLS, SSML batches) uses these
+        self.turn_pause_ms = turn_pause_ms
+        self.continuation_pause_ms = continuation_pause_ms
+        # When set, the episode is published as HLS chunks instead of one MP3
+        self.hls_chunk_seconds = hls_chunk_seconds
+        # Per-turn artifacts are kept losslessly ("pcm" or "flac") if requested;
+        # the final export is the only lossy encode either way
+        if intermediate_format not in (None, "pcm", "flac"):
+            raise ValueError(f"Unsupported intermediate format: {intermediate_format}")
+        self.intermediate_format = intermediate_format
+        # Per-segment decode, post-processing and intermediate encoding run in
+        # this many worker processes; None keeps them on the calling threads
+        self.audio_workers = audio_workers
+        self.rate_limiter = RateLimiter(requests_per_minute or spec.requests_per_minute)
+        self.segment_latencies: Dict[int, float] = {}
         os.makedirs(base_dir, exist_ok=True)
 
-        if service == "elevenlabs":
-            eleven_labs_key = os.getenv("ELEVEN_LABS_API_KEY")
-            if not eleven_labs_key:
-                raise ValueError("Missing ELEVEN_LABS_API_KEY environment variable")
-        elif service == "azure":
-            if not all(
-                [os.getenv("AZURE_SPEECH_KEY"), os.getenv("AZURE_SPEECH_REGION")]
+        # Synthesized segments are cached across runs; pass cache_max_mb=None to
+        # disable. Under a record/replay cassette every segment is synthesized
+        self.cache = None
+        if cache_max_mb and get_cassette() is None:
+            self.cache = DiskCache(
+                cache_dir or os.path.join(base_dir, ".tts_cache"),
+                max_bytes=cache_max_mb * 1024 * 1024,
+            )
+
+        # One long-lived backend (client/synthesizers) per generator; the
+        # provider SDK is only imported here, for the selected service
+        self.speaker_configs = get_speaker_configs(service)
+        # Options that shape the audio (model, output format) are part of the
+        # segment cache key
+        self.backend_options = dict(backend_options or {})
+        backend_options = dict(self.backend_options)
+        if spec.pooled:
+            # One session per synthesis worker, so none of them queue
+            backend_options.setdefault("pool_size", self.max_workers)
+        self.backend = create_backend(service, **backend_options)
+        # With an audio pool, compressed provider output is decoded there
+        self.encoded_format = None
+        if audio_workers:
+            self.encoded_format = getattr(self.backend, "encoded_format", None)
+
+    @retry(
+        wait=wait_random_exponential(multiplier=1, min=1, max=30),
+        stop=stop_after_attempt(5),
+        retry=retry_if_exception_type(TTSRateLimitError),
+        reraise=True,
+    )
+    def _generate_audio(self, turns: List[Turn]) -> bytes:
+        """Generate audio for one or more dialogue turns using configured service.
+
+        The result is raw PCM unless ``encoded_format`` is set, in which case
+        it is the provider's compressed output, left for the audio pool.
+        """
+        if len(turns) > 1:
+            return self.backend.synthesize_turns(
+                [(turn.speaker, turn.text) for turn in turns],
+                pause_ms=self.turn_pause_ms,
+                pauses=[self._pause_before(turn) for turn in turns],
+            )
+        if self.encoded_format:
+            return self.backend.synthesize_encoded(turns[0].text, turns[0].speaker)
+        return self.backend.synthesize(turns[0].text, turns[0].speaker)
+
+    def _pause_before(self, turn: Turn) -> int:
+        if turn.continuation:
+            return self.continuation_pause_ms
+        return self.turn_pause_ms
+
+    def _segment_cache_key(self, turns: List[Turn]) -> str:
+        """Hash the service, its options, the voice settings and normalized text."""
+        parts = [
+            (asdict(self.speaker_configs[turn.speaker]), " ".join(turn.text.split()))
+            for turn in turns
+        ]
+        if len(turns) > 1:
+            parts.append([self._pause_before(turn) for turn in turns])
+        return make_cache_key(self.service, self.backend_options, parts, SAMPLE_RATE)
+
+    def _synthesize_segment(
+        self, job: SynthesisJob, total: int, audio_pool: Optional[Executor] = None
+    ) -> bytes:
+        """Synthesize one job to PCM, respecting the provider rate limit.
+
+        With an audio pool the returned PCM is already post-processed.
+        """
+        idx, speaker = job.index, job.label
+        cache_key = self._segment_cache_key(job.turns) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.segment_latencies[idx] = 0.0
+                print(f"✓ Cache hit {idx + 1}/{total} ({speaker})")
+                return self._prepare_segment(job, cached, None, audio_pool)[1]
+
+        waited = self.rate_limiter.acquire()
+        start = time.perf_counter()
+        try:
+            audio = self._generate_audio(job.turns)
+        except Exception as e:
+            print(f"Failed to generate audio {idx + 1}/{total} for {speaker}: {e}")
+            raise
+        latency = time.perf_counter() - start
+
+        pcm, ready = self._prepare_segment(job, audio, self.encoded_format, audio_pool)
+        if cache_key:
+            self.cache.put(cache_key, pcm)
+
+        self.segment_latencies[idx] = latency
+        print(
+            f"✓ Generated {idx + 1}/{total} ({speaker}): "
+            f"{pcm_duration_ms(len(pcm)) / 1000:.1f}s of audio "
+            f"in {latency:.2f}s (queued {waited:.2f}s)"
+        )
+        return ready
+
+    def _prepare_segment(
+        self,
+        job: SynthesisJob,
+        audio: bytes,
+        source_format: Optional[str],
+        audio_pool: Optional[Executor],
+    ) -> Tuple[bytes, bytes]:
+        """Return the segment's PCM and the PCM to hand to the assembler.
+
+        Without a pool, audio is PCM already and is assembled as-is. With
+        one, decoding, the intermediate file and post-processing happen in a
+        worker process that exchanges plain byte buffers with this thread.
+        """
+        if audio_pool is None:
+            self._save_intermediate(job, audio)
+            return audio, audio
+
+        decoded, ready = audio_pool.submit(
+            prepare_segment,
+            audio,
+            source_format,
+            self.post_processing,
+            self._intermediate_path(job),
+            self.intermediate_format,
+        ).result()
+        # None means the audio was PCM already; an empty decode is a bad response
+        if decoded is None:
+            return audio, ready
+        if not decoded:
+            raise Exception(
+                f"Segment {job.index} decoded to no audio from {len(audio)} "
+                f"bytes of {source_format}"
+            )
+        return decoded, ready
+
+    def _intermediate_path(self, job: SynthesisJob) -> Optional[str]:
+        if not self.intermediate_format:
+            return None
+        name = f"{job.index:04d}_{job.label.replace('/', '-').lower()}"
+        return f"{self.output_dir}/segments/{name}.{self.intermediate_format}"
+
+    def _save_intermediate(self, job: SynthesisJob, pcm: bytes) -> None:
+        path = self._intermediate_path(job)
+        if path:
+            save_pcm(pcm, path, self.intermediate_format)
+
+    def _audio_pool(self):
+        """Context manager yielding the audio process pool, or None without one."""
+        if not self.audio_workers:
+            return nullcontext()
+        return create_audio_pool(self.audio_workers)
+
+    def _prepare_jobs(
+        self,
+        segments: List[Tuple[str, str]],
+        sections: Optional[List[int]] = None,
+    ) -> List[SynthesisJob]:
+        """Drop empty segments and group the rest into synthesis jobs.
+
+        ``sections`` gives each segment's script section; segments of
+        different sections are never merged into one job.
+        """
+        if sections is None:
+            sections = [0] * len(segments)
+        jobs: List[SynthesisJob] = []
+        for section in dict.fromkeys(sections):
+            for turns in self._job_turns(
+                [seg for seg, sec in zip(segments, sections) if sec == section]
             ):
-                raise ValueError(
-                    "Missing AZURE_SPEECH_KEY or AZURE_SPEECH_REGION environment variables"
+                jobs.append(
+                    SynthesisJob(
+                        len(jobs), turns, section, self._pause_before(turns[0])
+                    )
                 )
+        return jobs
+
+    def _job_turns(self, segments: List[Tuple[str, str]]) -> List[List[Turn]]:
+        """Turns of each synthesis job for one section's segments."""
+        if self.segment_max_chars:
+            turns = segment_turns(
+                segments,
+                min_chars=self.segment_min_chars,
+                max_chars=self.segment_max_chars,
+            )
+            print(f"Segmented {len(segments)} script turns into {len(turns)} chunks")
+        else:
+            turns = []
+            for speaker, text in segments:
+                # Clean the text
+                text = text.strip()
+                if not text:
+                    print(f"Skipping empty text for {speaker}")
+                    continue
+                turns.append(Turn(speaker, text))
+
+        if not self.ssml_batching:
+            return [[turn] for turn in turns]
+
+        jobs = [
+            [turns[i] for i in batch]
+            for batch in pack_ssml_batches(
+                [(turn.speaker, turn.text) for turn in turns]
+            )
+        ]
+        print(f"Packed {len(turns)} turns into {len(jobs)} SSML requests")
+        return jobs
+
+    def _first_chunk_latencies(self) -> Optional[List[float]]:
+        """Time to first audio of each streamed request, for streaming backends."""
+        # A cassette wrapper keeps the provider backend as .backend
+        backend = getattr(self.backend, "backend", self.backend)
+        return getattr(backend, "first_chunk_latencies", None)
+
+    def _reset_latencies(self) -> None:
+        self.segment_latencies = {}
+        first_chunks = self._first_chunk_latencies()
+        if first_chunks:
+            first_chunks.clear()
+
+    def _report_synthesis(self, elapsed: float) -> None:
+        if self.segment_latencies:
+            latencies = sorted(self.segment_latencies.values())
+            print(
+                f"Synthesized {len(latencies)} segments in {elapsed:.1f}s "
+                f"(median {latencies[len(latencies) // 2]:.2f}s, "
+                f"max {latencies[-1]:.2f}s per segment)"
+            )
+        first_chunks = sorted(self._first_chunk_latencies() or [])
+        if first_chunks:
+            print(
+                f"Time to first audio over {len(first_chunks)} requests: "
+                f"p50 {first_chunks[len(first_chunks) // 2]:.2f}s, "
+                f"max {first_chunks[-1]:.2f}s"
+            )
+        if self.cache:
+            print(f"Segment cache: {self.cache.stats}")
 
-    def _generate_audio_azure(self, text: str, speaker: str, output_path: str) -> str:
-        """Generate audio for a single piece of dialogue."""
-        wav_path = output_path.replace(".mp3", ".wav")
+    def _generate_audio_batch(self, jobs: List[SynthesisJob]) -> List[bytes]:
+        """Generate PCM for each job concurrently, returned in script order."""
+        self._reset_latencies()
 
-        speech_config = speechsdk.SpeechConfig(
-            subscription=os.getenv("AZURE_SPEECH_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION"),
+        print(
+            f"\nSynthesizing {len(jobs)} segments with {self.max_workers} worker(s)..."
         )
+        start = time.perf_counter()
+
+        with self._audio_pool() as audio_pool, ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            futures = [
+                executor.submit(self._synthesize_segment, job, len(jobs), audio_pool)
+                for job in jobs
+            ]
+            # Collect in submission order so the output matches the script order
+            chunks = [future.result() for future in futures]
+
+        self._report_synthesis(time.perf_counter() - start)
+        return chunks
+
+    def _stream_audio_batch(
+        self, jobs: List[SynthesisJob], sink: Union[StreamingMp3Encoder, HlsWriter]
+    ) -> None:
+        """Synthesize segments and hand them to an incremental sink as they complete.
+
+        At most ``2 * max_workers`` segments are in flight at once, and the
+        encoder consumes them strictly in script order, so memory stays bounded
+        while encoding overlaps with synthesis of later segments.
+        """
+        self._reset_latencies()
+        remaining = iter(jobs)
+        window = self.max_workers * 2
+
+        print(f"\nStreaming synthesis with {self.max_workers} worker(s)...")
+        start = time.perf_counter()
+
+        with self._audio_pool() as audio_pool, ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor, sink:
+
+            def submit_next(pending: deque) -> None:
+                job = next(remaining, None)
+                if job is not None:
+                    pending.append(
+                        executor.submit(
+                            self._synthesize_segment, job, len(jobs), audio_pool
+                        )
+                    )
+
+            pending = deque()
+            for _ in range(window):
+                submit_next(pending)
+
+            for idx, job in enumerate(jobs):
+                pcm = pending.popleft().result()
+                submit_next(pending)
+                if self.post_processing and audio_pool is None:
+                    pcm = process_segment(pcm, self.post_processing)
+                if isinstance(sink, HlsWriter):
+                    # Each script section is encoded (and re-published) on its own
+                    section_start = bool(idx) and job.section != jobs[idx - 1].section
+                    sink.write(pcm, job.pause_before_ms, section_start=section_start)
+                else:
+                    sink.write(pcm, pause_ms=job.pause_before_ms)
 
-        config = AZURE_SPEAKER_CONFIGS[speaker]
-        speech_config.speech_synthesis_voice_name = config.voice_name
-
-        # Create audio config with WAV format
-        audio_config = speechsdk.AudioConfig(filename=wav_path)
-
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config, audio_config=audio_config
-        )
+        if not sink.segments:
+            raise Exception("No audio files to merge")
 
-        # Generate audio
-        result = synthesizer.speak_text(text)
-
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            # Convert WAV to MP3 using pydub
-            if os.path.exists(wav_path):
-                audio = AudioSegment.from_wav(wav_path)
-                audio.export(output_path, format="mp3", bitrate="192k")
-                # Clean up WAV file
-                os.remove(wav_path)
-                return output_path
-        else:
-            print(f"Failed with reason: {result.reason}")
-            raise Exception(f"Speech synthesis failed with reason: {result.reason}")
+        self._report_synthesis(time.perf_counter() - start)
 
-    def _generate_audio_eleven_labs(
-        self, text: str, speaker: str, output_path: str
+    def _merge_audio(
+        self,
+        chunks: List[bytes],
+        pauses: List[int],
+        output_file: str,
+        processed: bool = False,
     ) -> str:
-        """Generate audio using Eleven Labs."""
-        config = ELEVEN_LABS_SPEAKER_CONFIGS[speaker]
-        client = ElevenLabs(api_key=os.getenv("ELEVEN_LABS_API_KEY"))
-
-        try:
-            voice_settings = VoiceSettings(
-                stability=config.stability,
-                similarity_boost=config.similarity_boost,
-                style=config.style,
-                use_speaker_boost=config.use_speaker_boost,
-            )
+        """Merge PCM segments, given in playback order, with pauses between them.
 
-            voice = Voice(voice_id=config.voice_id, settings=voice_settings)
+        ``processed`` chunks were already post-processed by the audio pool and
+        are only stitched together.
+        """
+        print(f"\nStarting merge of {len(chunks)} segments...")
 
-            audio = client.generate(text=text, voice=voice, model=config.model_id)
-            save(audio, output_path)
-            return output_path
-        except Exception as e:
-            raise Exception(f"Eleven Labs synthesis failed: {str(e)}")
-
-    def _generate_audio(self, text: str, speaker: str, output_path: str) -> str:
-        """Generate audio for a single piece of dialogue using configured service."""
-        if self.service == "azure":
-            return self._generate_audio_azure(text, speaker, output_path)
-        elif self.service == "elevenlabs":
-            return self._generate_audio_eleven_labs(text, speaker, output_path)
-        else:
-            raise ValueError(f"Unsupported speech service: {self.service}")
-
-    def _generate_audio_batch(self, segments: List[Tuple[str, str, int]]) -> List[str]:
-        """Generate audio files sequentially."""
-        audio_files = []
-
-        for idx, (speaker, text, timestamp) in enumerate(segments):
-            # Clean the text
-            text = text.strip()
-            if not text:
-                print(f"Skipping empty text for {speaker}")
-                continue
-
-            # Use the unique timestamp in the filename
-            output_path = f"{self.output_dir}/{speaker.lower()}_{timestamp:013d}.mp3"
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            try:
-                print(f"\nGenerating audio {idx + 1}/{len(segments)} for {speaker}:")
-                print(f"Text: {text[:100]}...")
-                result = self._generate_audio(text, speaker, output_path)
-                audio_files.append(result)
-                print(f"✓ Generated: {os.path.basename(output_path)}")
-            except Exception as e:
-                print(f"Failed to generate audio for {speaker}: {e}")
-                raise
-
-        return audio_files
-
-    def _merge_audio_files(self, audio_files: List[str], output_file: str) -> str:
-        """Merge audio files with crossfade."""
-        print(f"\nStarting merge of {len(audio_files)} files...")
-
-        if not audio_files:
+        if not chunks:
             raise Exception("No audio files to merge")
 
-        merged = AudioSegment.empty()
-        sorted_files = sorted(
-            audio_files, key=lambda x: int(re.search(r"_(\d{13})", x).group(1))
-        )
-
-        print("\nProcessing files in order:")
-        for idx, file in enumerate(sorted_files):
-            print(f"Processing {idx + 1}/{len(sorted_files)}: {os.path.basename(file)}")
-            if not os.path.exists(file):
-                print(f"Warning: File does not exist: {file}")
-                continue
-
-            try:
-                audio = AudioSegment.from_mp3(file)
-                print(f"Loaded audio segment, duration: {len(audio)}ms")
-
-                if len(merged) > 0:
-                    # Add small pause between segments
-                    silence = AudioSegment.silent(duration=500)  # 500ms pause
-                    merged = merged + silence + audio
-                else:
-                    merged = audio
-            except Exception as e:
-                print(f"Error processing {file}: {e}")
-                raise
+        if processed:
+            # Segments trimmed to nothing get no pause, as in process_episode
+            kept = [idx for idx, chunk in enumerate(chunks) if chunk]
+            pcm = assemble_pcm(
+                [chunks[idx] for idx in kept],
+                pause_ms=self.turn_pause_ms,
+                pauses=[pauses[idx] for idx in kept],
+            )
+        elif self.post_processing:
+            pcm = process_episode(chunks, pauses, self.post_processing).tobytes()
+        else:
+            pcm = assemble_pcm(chunks, pause_ms=self.turn_pause_ms, pauses=pauses)
+        merged = pcm_to_segment(pcm)
 
         print(f"\nExporting final audio to: {output_file}")
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
@@ -212,9 +463,12 @@ class PodcastGenerator:
             parameters=["-acodec", "libmp3lame", "-q:a", "2"],
         )
 
+        self._report_output(output_file, len(merged) / 1000)
+        return output_file
+
+    def _report_output(self, output_file: str, duration_sec: float) -> None:
         if os.path.exists(output_file):
             size_mb = os.path.getsize(output_file) / (1024 * 1024)
-            duration_sec = len(merged) / 1000
             print(f"Successfully created merged file:")
             print(f"- Path: {output_file}")
             print(f"- Size: {size_mb:.2f}MB")
@@ -222,8 +476,6 @@ class PodcastGenerator:
         else:
             raise Exception(f"Failed to create merged file: {output_file}")
 
-        return output_file
-
     def generate_podcast(self, script: str) -> str:
         """Main method to generate podcast from script."""
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
@@ -231,24 +483,66 @@ class PodcastGenerator:
         os.makedirs(self.output_dir, exist_ok=True)
 
         segments = []
-        matches = re.findall(
-            r"(Host|Learner|Expert):\s*(.*?)(?=(Host|Learner|Expert|$))",
-            script,
-            re.DOTALL,
-        )
-
-        # Create segments with unique timestamps for each dialogue
-        for idx, (speaker, text, _) in enumerate(matches):
-            # Use combination of base timestamp and index for unique ordering
-            segment_timestamp = int(datetime.datetime.now().timestamp() * 1000) + idx
-            segments.append((speaker, text.strip(), segment_timestamp))
-            print(f"Added segment {idx + 1}: {speaker} - {text[:50]}...")
+        sections = []
+        # Segments are kept in script order; that order is the playback order
+        for section, section_script in enumerate(split_sections(script)):
+            matches = re.findall(
+                r"(Host|Learner|Expert):\s*(.*?)(?=(Host|Learner|Expert|$))",
+                section_script,
+                re.DOTALL,
+            )
+            for speaker, text, _ in matches:
+                segments.append((speaker, text.strip()))
+                sections.append(section)
+                print(f"Added segment {len(segments)}: {speaker} - {text[:50]}...")
 
         print(f"\nFound {len(segments)} dialogue segments")
 
-        audio_files = self._generate_audio_batch(segments)
-
         output_file = (
             f"{self.output_dir}/podcast_{int(datetime.datetime.now().timestamp())}.mp3"
         )
-        return self._merge_audio_files(audio_files, output_file)
+        jobs = self._prepare_jobs(segments, sections)
+        if self.hls_chunk_seconds:
+            playlist = f"{self.output_dir}/playlist.m3u8"
+            chunk_dir = os.path.join(self.base_dir, "hls_chunks")
+            writer = HlsWriter(
+                playlist,
+                chunk_dir=chunk_dir,
+                chunk_seconds=self.hls_chunk_seconds,
+                pause_ms=self.turn_pause_ms,
+            )
+            self._stream_audio_batch(jobs, writer)
+            # Chunks of episodes whose playlists were deleted are no longer needed
+            removed = remove_orphaned_chunks(
+                chunk_dir, glob.glob(f"{self.base_dir}/podcast_*/playlist.m3u8")
+            )
+            print(
+                f"Published HLS playlist: {playlist} ({len(writer.chunks)} chunks, "
+                f"{writer.encoded_chunks} newly encoded, "
+                f"{writer.duration_ms / 1000:.1f} seconds, "
+                f"{removed} orphaned chunks removed)"
+            )
+            return playlist
+
+        if self.streaming:
+            encoder = StreamingMp3Encoder(output_file, pause_ms=self.turn_pause_ms)
+            self._stream_audio_batch(jobs, encoder)
+            self._report_output(output_file, encoder.duration_ms / 1000)
+            return output_file
+
+        chunks = self._generate_audio_batch(jobs)
+        pauses = [job.pause_before_ms for job in jobs]
+        return self._merge_audio(
+            chunks,
+            pauses,
+            output_file,
+            processed=bool(self.audio_workers and self.post_processing),
+        )
+
+    async def agenerate_podcast(self, script: str) -> str:
+        """Async variant of generate_podcast.
+
+        Synthesis already fans out over its own thread pool, so the whole run
+        is moved off the event loop rather than rewritten per backend.
+        """
+        return await asyncio.to_thread(self.generate_podcast, script)
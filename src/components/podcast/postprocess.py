@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from src.components.podcast.assembler import SAMPLE_RATE
+
+# NumPy is imported on first use so importing the pipeline stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+
+INT16_MAX = 32767
+
+
+@dataclass(frozen=True)
+class PostProcessingConfig:
+    # Loudness every segment is brought to, as RMS relative to full scale
+    target_dbfs: float = -20.0
+    # Cap on the boost applied to quiet segments
+    max_gain_db: float = 12.0
+    # Samples quieter than this at segment edges are trimmed
+    silence_threshold_dbfs: float = -45.0
+    # Audio kept on either side of the first/last loud sample
+    edge_padding_ms: int = 40
+
+
+DEFAULT_POST_PROCESSING = PostProcessingConfig()
+
+
+# Samples scaled per step when normalizing, bounding temporary buffers
+BLOCK_SAMPLES = 1 << 16
+
+
+def _loud_bounds(samples: "np.ndarray", limit: int) -> Tuple[int, int]:
+    """First and last sample louder than limit, or (-1, -1) if none is."""
+    import numpy as np
+
+    loud = (samples > limit) | (samples < -limit)
+    first = int(np.argmax(loud)) if len(loud) else 0
+    if not len(loud) or not loud[first]:
+        return -1, -1
+    return first, len(samples) - 1 - int(np.argmax(loud[::-1]))
+
+
+def process_episode(
+    chunks: List[bytes],
+    pauses: Optional[List[int]] = None,
+    config: PostProcessingConfig = DEFAULT_POST_PROCESSING,
+) -> "np.ndarray":
+    """Trim, loudness-normalize and join PCM segments into one sample array.
+
+    Each segment is read in place as an int16 view; edge silence, RMS and
+    gain are reduced over its slice, and the kept samples are scaled block
+    by block straight into the output buffer with ``pauses[i]`` milliseconds
+    of silence before segment ``i``. Memory stays at about the output size
+    plus per-segment temporaries. Segments with no sample above the silence
+    threshold are dropped.
+    """
+    import numpy as np
+
+    if pauses is None:
+        pauses = [0] * len(chunks)
+
+    # |x| > threshold is |x| > floor(threshold) for integer samples, which
+    # keeps the comparisons in int16
+    limit = int(INT16_MAX * 10 ** (config.silence_threshold_dbfs / 20))
+    padding = int(SAMPLE_RATE * config.edge_padding_ms / 1000)
+
+    kept = []
+    for chunk, pause in zip(chunks, pauses):
+        samples = np.frombuffer(chunk, dtype=np.int16, count=len(chunk) // 2)
+        first, last = _loud_bounds(samples, limit)
+        if last == -1:
+            continue
+        samples = samples[
+            max(first - padding, 0) : min(last + padding, len(samples) - 1) + 1
+        ]
+
+        # RMS over the kept region, then a capped gain towards the target
+        energy = sum(
+            float(np.dot(block, block))
+            for block in (
+                samples[start : start + BLOCK_SAMPLES].astype(np.float64)
+                for start in range(0, len(samples), BLOCK_SAMPLES)
+            )
+        )
+        rms = np.sqrt(energy / len(samples))
+        rms_dbfs = 20 * np.log10(max(rms, 1.0) / INT16_MAX)
+        gain_db = min(config.target_dbfs - rms_dbfs, config.max_gain_db)
+        # Nothing precedes the first kept segment
+        gap = int(SAMPLE_RATE * pause / 1000) if kept else 0
+        kept.append((samples, 10 ** (gain_db / 20), gap))
+
+    output = np.zeros(sum(len(s) + gap for s, _, gap in kept), dtype=np.int16)
+    offset = 0
+    for samples, gain, gap in kept:
+        offset += gap
+        for start in range(0, len(samples), BLOCK_SAMPLES):
+            scaled = samples[start : start + BLOCK_SAMPLES] * gain
+            np.clip(scaled, -INT16_MAX - 1, INT16_MAX, out=scaled)
+            output[offset + start : offset + start + len(scaled)] = scaled
+        offset += len(samples)
+    return output
+
+
+def process_segment(
+    pcm: bytes, config: PostProcessingConfig = DEFAULT_POST_PROCESSING
+) -> bytes:
+    """Trim and normalize a single PCM segment."""
+    return process_episode([pcm], config=config).tobytes()
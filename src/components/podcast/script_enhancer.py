@@ -1,17 +1,198 @@
-from typing import Dict, List
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, List, Optional, Tuple
 
 from src.components.base import BaseComponent
-from src.prompts.dialogue import SCRIPT_ENHANCEMENT_PROMPT
+from src.prompts.dialogue import (
+    SCRIPT_ENHANCEMENT_PROMPT,
+    SECTION_ENHANCEMENT_PROMPT,
+    TRANSITION_PROMPT,
+)
+from src.utils.script_parser import SECTION_BREAK
+
+SPEAKER_LINE = re.compile(r"^\W*(Host|Learner|Expert)\W*:\s*(.+)$")
+
+
+def dialogue_lines(text: str) -> List[str]:
+    """Normalized "Speaker: text" lines of a completion, dropping anything else."""
+    lines = []
+    for line in text.splitlines():
+        match = SPEAKER_LINE.match(line.strip())
+        if match:
+            lines.append(f"{match.group(1)}: {match.group(2).strip()}")
+    return lines
 
 
 class ScriptEnhancer(BaseComponent):
     """Component for enhancing and formatting the final podcast script."""
 
+    # Characters of each neighbouring section shown as context in section mode
+    context_chars = 600
+    # Lines on each side of a section boundary rewritten by the transition pass
+    transition_lines = 2
+    # Parallel completions in section mode (sync path)
+    max_workers = 8
+
     def enhance_script(self, introduction: str, dialogues: List[Dict[str, str]]) -> str:
         """Enhance the podcast script by improving transitions and reducing redundancy."""
+        prompt = self._enhancement_prompt(introduction, dialogues)
+        return self.openai_service.generate_completion(prompt, stage="enhancement")
+
+    async def aenhance_script(
+        self, introduction: str, dialogues: List[Dict[str, str]]
+    ) -> str:
+        prompt = self._enhancement_prompt(introduction, dialogues)
+        return await self.openai_service.agenerate_completion(
+            prompt, stage="enhancement"
+        )
+
+    def _enhancement_prompt(
+        self, introduction: str, dialogues: List[Dict[str, str]]
+    ) -> str:
         full_script = introduction + "\n\n"
         for dialogue in dialogues:
             full_script += f"{dialogue['dialogue']}\n\n"
 
-        prompt = SCRIPT_ENHANCEMENT_PROMPT.format(script=full_script)
-        return self.openai_service.generate_completion(prompt)
+        return SCRIPT_ENHANCEMENT_PROMPT.format(script=full_script)
+
+    def enhance_script_sections(
+        self, introduction: str, dialogues: List[Dict[str, str]]
+    ) -> str:
+        """Enhance the intro and each section in parallel, then smooth the joins.
+
+        Every part is enhanced on its own, seeing only the edges of its
+        neighbours, and a second parallel pass rewrites just the lines around
+        each boundary. Latency follows the longest section rather than the
+        whole episode.
+        """
+        parts = self._parts(introduction, dialogues)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+            def complete_all(prompts: List[str], stage: str) -> List[str]:
+                # Each call gets a copy of the caller's context (usage recorder)
+                futures = [
+                    executor.submit(
+                        copy_context().run,
+                        self.openai_service.generate_completion,
+                        prompt,
+                        stage=stage,
+                    )
+                    for prompt in prompts
+                ]
+                return [future.result() for future in futures]
+
+            prompts = [self._section_prompt(parts, idx) for idx in range(len(parts))]
+            sections = self._section_lines(
+                parts, complete_all(prompts, "section_enhancement")
+            )
+            spans, prompts = self._transition_prompts(sections)
+            rewrites = complete_all([p for p in prompts if p], "transition")
+
+        return self._stitch(sections, spans, prompts, rewrites)
+
+    async def aenhance_script_sections(
+        self, introduction: str, dialogues: List[Dict[str, str]]
+    ) -> str:
+        parts = self._parts(introduction, dialogues)
+
+        async def complete_all(prompts: List[str], stage: str) -> List[str]:
+            return await asyncio.gather(
+                *(
+                    self.openai_service.agenerate_completion(prompt, stage=stage)
+                    for prompt in prompts
+                )
+            )
+
+        prompts = [self._section_prompt(parts, idx) for idx in range(len(parts))]
+        sections = self._section_lines(
+            parts, await complete_all(prompts, "section_enhancement")
+        )
+        spans, prompts = self._transition_prompts(sections)
+        rewrites = await complete_all([p for p in prompts if p], "transition")
+
+        return self._stitch(sections, spans, prompts, rewrites)
+
+    @staticmethod
+    def _parts(introduction: str, dialogues: List[Dict[str, str]]) -> List[str]:
+        parts = [introduction] + [dialogue["dialogue"] for dialogue in dialogues]
+        return [part.strip() for part in parts if part.strip()]
+
+    def _section_prompt(self, parts: List[str], idx: int) -> str:
+        previous = following = ""
+        if idx > 0:
+            before = parts[idx - 1]
+            previous = before[max(len(before) - self.context_chars, 0) :]
+        if idx + 1 < len(parts):
+            following = parts[idx + 1][: self.context_chars]
+        return SECTION_ENHANCEMENT_PROMPT.format(
+            previous=previous or "(start of the episode)",
+            section=parts[idx],
+            next=following or "(end of the episode)",
+        )
+
+    @staticmethod
+    def _section_lines(parts: List[str], completions: List[str]) -> List[List[str]]:
+        # A section whose completion has no dialogue lines keeps its draft
+        return [
+            dialogue_lines(completion) or dialogue_lines(part)
+            for part, completion in zip(parts, completions)
+        ]
+
+    def _transition_prompts(
+        self, sections: List[List[str]]
+    ) -> Tuple[List[Tuple[int, int]], List[Optional[str]]]:
+        """Lines (head, tail) each section gives to its boundaries, and a prompt
+        per boundary (None where one side has no lines to rewrite)."""
+        spans = []
+        for idx, lines in enumerate(sections):
+            head = min(self.transition_lines, len(lines) // 2) if idx else 0
+            tail = 0
+            if idx + 1 < len(sections):
+                tail = min(self.transition_lines, len(lines) - head)
+            spans.append((head, tail))
+
+        prompts: List[Optional[str]] = []
+        for idx in range(len(sections) - 1):
+            tail, head = spans[idx][1], spans[idx + 1][0]
+            if not (tail and head):
+                prompts.append(None)
+                continue
+            prompts.append(
+                TRANSITION_PROMPT.format(
+                    before="\n".join(sections[idx][-tail:]),
+                    after="\n".join(sections[idx + 1][:head]),
+                )
+            )
+        return spans, prompts
+
+    @staticmethod
+    def _stitch(
+        sections: List[List[str]],
+        spans: List[Tuple[int, int]],
+        prompts: List[Optional[str]],
+        rewrites: List[str],
+    ) -> str:
+        """Join section bodies with the rewritten (or original) boundary lines.
+
+        Sections are separated by a SECTION_BREAK line.
+        """
+        rewritten = iter(rewrites)
+        script: List[str] = []
+        for idx, lines in enumerate(sections):
+            head, tail = spans[idx]
+            script.extend(lines[head : len(lines) - tail])
+            if idx + 1 == len(sections):
+                break
+
+            bridge = dialogue_lines(next(rewritten)) if prompts[idx] else []
+            if bridge:
+                # The rewritten transition opens the next section
+                script.append(SECTION_BREAK)
+                script.extend(bridge)
+            else:
+                script.extend(lines[len(lines) - tail :])
+                script.append(SECTION_BREAK)
+                script.extend(sections[idx + 1][: spans[idx + 1][0]])
+        return "\n".join(script)
@@ -3,6 +3,7 @@ from typing import Dict, List, Tuple
 from src.components.base import BaseComponent
 from src.models.types import Section
 from src.prompts.script_planning import SCRIPT_PLAN_PROMPT
+from src.utils.context import pack_posts, report_prompt
 from src.utils.formatting import format_posts_for_script
 from src.utils.script_parser import parse_script_plan
 
@@ -10,10 +11,29 @@ from src.utils.script_parser import parse_script_plan
 class ScriptPlanner(BaseComponent):
     """Component for planning podcast scripts from processed posts."""
 
+    # Token budget for the post context in the planning prompt
+    context_tokens = 6000
+
+    def _plan_prompt(self, processed_posts: List[Dict]) -> str:
+        packed = pack_posts(processed_posts, self.context_tokens)
+        prompt = SCRIPT_PLAN_PROMPT.format(
+            posts=format_posts_for_script(processed_posts, packed)
+        )
+        report_prompt("Script plan", prompt, packed)
+        return prompt
+
     def generate_plan(self, processed_posts: List[Dict]) -> Tuple[str, List[Section]]:
-        formatted_posts = format_posts_for_script(processed_posts)
         response = self.openai_service.generate_completion(
-            SCRIPT_PLAN_PROMPT.format(posts=formatted_posts)
+            self._plan_prompt(processed_posts), stage="plan"
+        )
+        sections = parse_script_plan(response, processed_posts)
+        return response, sections
+
+    async def agenerate_plan(
+        self, processed_posts: List[Dict]
+    ) -> Tuple[str, List[Section]]:
+        response = await self.openai_service.agenerate_completion(
+            self._plan_prompt(processed_posts), stage="plan"
         )
-        sections = parse_script_plan(response)
+        sections = parse_script_plan(response, processed_posts)
         return response, sections
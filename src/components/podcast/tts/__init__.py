@@ -0,0 +1,94 @@
+"""Text-to-speech backends producing raw PCM for the episode assembler.
+
+Backends are registered by name with the dotted path of their class, and the
+module (with its provider SDK) is only imported when that backend is created.
+"""
+import importlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.components.podcast.tts.cassette import CassetteBackend
+from src.utils.cassette import get_cassette
+
+
+class TTSRateLimitError(Exception):
+    """Raised by a backend when the provider rejects a request for rate limiting."""
+
+
+@dataclass
+class BackendSpec:
+    # "package.module:ClassName", imported on first use
+    target: str
+    # Dotted path of the speaker -> voice config mapping for this backend
+    speaker_configs: str
+    # Whether the backend can synthesize several turns in one request
+    supports_batching: bool = False
+    # Default request quota in requests per minute, None for unlimited
+    requests_per_minute: Optional[float] = None
+    # Whether the backend takes a ``pool_size`` of concurrent sessions per voice
+    pooled: bool = False
+
+
+_BACKENDS: Dict[str, BackendSpec] = {}
+
+
+def register_backend(name: str, spec: BackendSpec) -> None:
+    """Register a TTS backend under name."""
+    _BACKENDS[name] = spec
+
+
+def get_backend_spec(name: str) -> BackendSpec:
+    if name not in _BACKENDS:
+        raise ValueError(f"Unsupported speech service: {name}")
+    return _BACKENDS[name]
+
+
+def _load(path: str) -> Any:
+    module_name, attribute = path.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def get_speaker_configs(name: str) -> Dict:
+    return _load(get_backend_spec(name).speaker_configs)
+
+
+def create_backend(name: str, **options: Any):
+    """Import the named backend's module and instantiate it with its voices.
+
+    With a record/replay cassette active the backend is wrapped so its audio
+    is recorded, or replaced outright when replaying.
+    """
+    spec = get_backend_spec(name)
+    cassette = get_cassette()
+    if cassette and cassette.replaying:
+        return CassetteBackend(name, None, cassette)
+    backend = _load(spec.target)(get_speaker_configs(name), **options)
+    return CassetteBackend(name, backend, cassette) if cassette else backend
+
+
+register_backend(
+    "azure",
+    BackendSpec(
+        target="src.components.podcast.tts.azure:AzureSpeechBackend",
+        speaker_configs="src.components.podcast.tts.voices:AZURE_SPEAKER_CONFIGS",
+        supports_batching=True,
+        requests_per_minute=200,
+        pooled=True,
+    ),
+)
+register_backend(
+    "elevenlabs",
+    BackendSpec(
+        target="src.components.podcast.tts.elevenlabs:ElevenLabsBackend",
+        speaker_configs="src.components.podcast.tts.voices:ELEVEN_LABS_SPEAKER_CONFIGS",
+        requests_per_minute=100,
+    ),
+)
+register_backend(
+    "local",
+    BackendSpec(
+        target="src.components.podcast.tts.local:LocalSpeechBackend",
+        speaker_configs="src.components.podcast.tts.voices:LOCAL_SPEAKER_CONFIGS",
+        supports_batching=True,
+    ),
+)
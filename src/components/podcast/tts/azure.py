@@ -0,0 +1,130 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import azure.cognitiveservices.speech as speechsdk
+
+from src.components.podcast.assembler import TURN_PAUSE_MS
+from src.components.podcast.tts import TTSRateLimitError
+from src.components.podcast.tts.ssml import build_ssml
+
+
+class AzureSpeechBackend:
+    """Azure Speech synthesis over a pool of warm synthesizers per voice.
+
+    A synthesizer handles one request at a time (the SDK queues the rest),
+    so each voice gets up to ``pool_size`` of them, one per concurrent
+    caller. The first per voice is created up front, the others when
+    concurrent requests first need them; all are reused and keep their
+    service connection open.
+    Audio is returned in memory as raw 24kHz 16-bit mono PCM, so no
+    intermediate files or codec passes are involved. Requests are sent as
+    SSML so each speaker's style and style degree are applied.
+    """
+
+    def __init__(self, speaker_configs: Dict, pool_size: int = 4):
+        key = os.getenv("AZURE_SPEECH_KEY")
+        region = os.getenv("AZURE_SPEECH_REGION")
+        if not all([key, region]):
+            raise ValueError(
+                "Missing AZURE_SPEECH_KEY or AZURE_SPEECH_REGION environment variables"
+            )
+
+        self.speaker_configs = speaker_configs
+        self.pool_size = max(1, pool_size)
+        self._key = key
+        self._region = region
+        self._connections = []
+        # Idle synthesizers per voice, most recently used first
+        self._idle: Dict[str, "queue.LifoQueue[speechsdk.SpeechSynthesizer]"] = {}
+        self._created: Dict[str, int] = {}
+        self._pool_lock = threading.Lock()
+        for config in speaker_configs.values():
+            if config.voice_name not in self._idle:
+                self._idle[config.voice_name] = queue.LifoQueue()
+                self._idle[config.voice_name].put(
+                    self._create_synthesizer(key, region, config.voice_name)
+                )
+                self._created[config.voice_name] = 1
+
+    def _create_synthesizer(
+        self, key: str, region: str, voice_name: str
+    ) -> speechsdk.SpeechSynthesizer:
+        speech_config = speechsdk.SpeechConfig(subscription=key, region=region)
+        speech_config.speech_synthesis_voice_name = voice_name
+        speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm
+        )
+
+        # audio_config=None keeps the synthesized audio in memory on the result
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config, audio_config=None
+        )
+
+        # Open the connection up front so the first request doesn't pay for it
+        connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        connection.open(True)
+        self._connections.append(connection)
+        return synthesizer
+
+    @contextmanager
+    def _synthesizer(self, voice_name: str) -> Iterator[speechsdk.SpeechSynthesizer]:
+        """Borrow an idle synthesizer, creating one while the pool has room."""
+        idle = self._idle[voice_name]
+        try:
+            synthesizer = idle.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                grow = self._created[voice_name] < self.pool_size
+                if grow:
+                    self._created[voice_name] += 1
+            if not grow:
+                synthesizer = idle.get()
+            else:
+                try:
+                    synthesizer = self._create_synthesizer(
+                        self._key, self._region, voice_name
+                    )
+                except Exception:
+                    with self._pool_lock:
+                        self._created[voice_name] -= 1
+                    raise
+        try:
+            yield synthesizer
+        finally:
+            idle.put(synthesizer)
+
+    def synthesize(self, text: str, speaker: str) -> bytes:
+        """Synthesize text with the speaker's voice and return raw PCM."""
+        return self.synthesize_turns([(speaker, text)])
+
+    def synthesize_turns(
+        self,
+        turns: List[Tuple[str, str]],
+        pause_ms: int = TURN_PAUSE_MS,
+        pauses: Optional[List[int]] = None,
+    ) -> bytes:
+        """Synthesize consecutive turns in a single SSML request."""
+        ssml = build_ssml(turns, self.speaker_configs, pause_ms, pauses)
+        first_voice = self.speaker_configs[turns[0][0]].voice_name
+        with self._synthesizer(first_voice) as synthesizer:
+            result = synthesizer.speak_ssml_async(ssml).get()
+
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result.audio_data
+
+        details = ""
+        if result.reason == speechsdk.ResultReason.Canceled:
+            cancellation = result.cancellation_details
+            details = f": {cancellation.error_details}"
+            if (
+                cancellation.error_code
+                == speechsdk.CancellationErrorCode.TooManyRequests
+            ):
+                raise TTSRateLimitError(f"Azure speech rate limit exceeded{details}")
+        print(f"Failed with reason: {result.reason}")
+        raise Exception(
+            f"Speech synthesis failed with reason: {result.reason}{details}"
+        )
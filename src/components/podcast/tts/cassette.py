@@ -0,0 +1,48 @@
+from typing import Any, List, Optional, Tuple
+
+from src.components.podcast.assembler import TURN_PAUSE_MS
+from src.utils.cassette import Cassette
+
+
+class CassetteBackend:
+    """Routes a backend's synthesis calls through a record/replay cassette.
+
+    When recording, calls go to the wrapped backend and the audio it returns
+    is stored. When replaying there is no wrapped backend (and no provider
+    credentials are needed); audio comes from the cassette, as does the
+    output format the backend reported when the cassette was recorded.
+    """
+
+    def __init__(self, name: str, backend: Any, cassette: Cassette):
+        self.name = name
+        self.backend = backend
+        self.cassette = cassette
+
+    def _call(self, method: str, *args: Any) -> Any:
+        return self.cassette.call(
+            "tts",
+            (self.name, method, args),
+            lambda: getattr(self.backend, method)(*args),
+        )
+
+    @property
+    def encoded_format(self) -> Optional[str]:
+        return self.cassette.call(
+            "tts",
+            (self.name, "encoded_format"),
+            lambda: getattr(self.backend, "encoded_format", None),
+        )
+
+    def synthesize(self, text: str, speaker: str) -> bytes:
+        return self._call("synthesize", text, speaker)
+
+    def synthesize_encoded(self, text: str, speaker: str) -> bytes:
+        return self._call("synthesize_encoded", text, speaker)
+
+    def synthesize_turns(
+        self,
+        turns: List[Tuple[str, str]],
+        pause_ms: int = TURN_PAUSE_MS,
+        pauses: Optional[List[int]] = None,
+    ) -> bytes:
+        return self._call("synthesize_turns", turns, pause_ms, pauses)
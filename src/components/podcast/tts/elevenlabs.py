@@ -0,0 +1,97 @@
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+from elevenlabs import VoiceSettings
+from elevenlabs.client import ElevenLabs
+
+from src.components.podcast.assembler import SAMPLE_RATE, decode_pcm
+from src.components.podcast.tts import TTSRateLimitError
+
+
+class ElevenLabsBackend:
+    """Eleven Labs synthesis over one long-lived client.
+
+    Audio is consumed from the streaming endpoint chunk by chunk. With a
+    ``pcm_*`` output format matching the assembler sample rate the chunks are
+    used as-is; any other format is decoded once after download.
+    Set ELEVEN_LABS_BASE_URL to point the client at a local HTTP stand-in.
+    """
+
+    def __init__(
+        self,
+        speaker_configs: Dict,
+        output_format: str = f"pcm_{SAMPLE_RATE}",
+        base_url: Optional[str] = None,
+    ):
+        api_key = os.getenv("ELEVEN_LABS_API_KEY")
+        if not api_key:
+            raise ValueError("Missing ELEVEN_LABS_API_KEY environment variable")
+
+        self.speaker_configs = speaker_configs
+        self.output_format = output_format
+        # Seconds from request to first audio chunk, per stream; reported
+        # by PodcastGenerator after each synthesis batch
+        self.first_chunk_latencies: List[float] = []
+
+        base_url = base_url or os.getenv("ELEVEN_LABS_BASE_URL")
+        client_options = {"base_url": base_url} if base_url else {}
+        self._client = ElevenLabs(api_key=api_key, **client_options)
+
+    def stream(self, text: str, speaker: str) -> Iterator[bytes]:
+        """Yield audio chunks in the configured output format as they arrive."""
+        config = self.speaker_configs[speaker]
+        voice_settings = VoiceSettings(
+            stability=config.stability,
+            similarity_boost=config.similarity_boost,
+            style=config.style,
+            use_speaker_boost=config.use_speaker_boost,
+        )
+
+        # elevenlabs>=2 renamed convert_as_stream to stream
+        tts = self._client.text_to_speech
+        stream = getattr(tts, "convert_as_stream", None) or tts.stream
+
+        start = time.perf_counter()
+        chunks = stream(
+            voice_id=config.voice_id,
+            text=text,
+            model_id=config.model_id,
+            voice_settings=voice_settings,
+            output_format=self.output_format,
+        )
+
+        first = True
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if first:
+                self.first_chunk_latencies.append(time.perf_counter() - start)
+                first = False
+            yield chunk
+
+    @property
+    def encoded_format(self) -> Optional[str]:
+        """Codec of synthesize_encoded output, or None if it is already PCM."""
+        if self.output_format == f"pcm_{SAMPLE_RATE}":
+            return None
+        return self.output_format.split("_")[0]
+
+    def synthesize_encoded(self, text: str, speaker: str) -> bytes:
+        """Synthesize text and return the audio in the configured output format."""
+        try:
+            audio = bytearray()
+            for chunk in self.stream(text, speaker):
+                audio.extend(chunk)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                raise TTSRateLimitError(f"Eleven Labs rate limit exceeded: {str(e)}")
+            raise Exception(f"Eleven Labs synthesis failed: {str(e)}")
+        return bytes(audio)
+
+    def synthesize(self, text: str, speaker: str) -> bytes:
+        """Synthesize text with the speaker's voice and return raw PCM."""
+        audio = self.synthesize_encoded(text, speaker)
+        if self.encoded_format is None:
+            return audio
+        return decode_pcm(audio, self.encoded_format)
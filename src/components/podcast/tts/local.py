@@ -0,0 +1,121 @@
+import hashlib
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.components.podcast.assembler import SAMPLE_RATE, TURN_PAUSE_MS, pause_bytes
+from src.components.podcast.tts import TTSRateLimitError
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "lognormal")
+
+
+class LocalSpeechBackend:
+    """Offline stand-in for a TTS provider, for load tests and profiling.
+
+    Audio is a deterministic speech-like signal (a harmonic tone at the
+    speaker's pitch, modulated at syllable rate) whose length follows the
+    word count. Request latency is drawn from a configurable distribution
+    and scales with text length; rate-limit errors and failures are injected
+    with fixed probabilities. Given the same seed, the same text always
+    yields the same audio, latency and outcome on each attempt.
+    """
+
+    def __init__(
+        self,
+        speaker_configs: Dict,
+        words_per_minute: float = 160.0,
+        latency_distribution: str = "lognormal",
+        latency_base: float = 0.3,
+        latency_per_char: float = 0.002,
+        latency_sigma: float = 0.4,
+        rate_limit_rate: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unsupported latency distribution: {latency_distribution}"
+            )
+
+        self.speaker_configs = speaker_configs
+        self.words_per_minute = words_per_minute
+        self.latency_distribution = latency_distribution
+        self.latency_base = latency_base
+        self.latency_per_char = latency_per_char
+        self.latency_sigma = latency_sigma
+        self.rate_limit_rate = rate_limit_rate
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.requests = 0
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _simulate_request(self, key: str, chars: int) -> None:
+        """Sleep for a sampled latency, then maybe raise an injected error.
+
+        The random stream is seeded from the request key and attempt number,
+        so retries of the same request see fresh but reproducible outcomes.
+        """
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+            self.requests += 1
+        digest = hashlib.sha256(f"{self.seed}:{attempt}:{key}".encode()).digest()
+        rng = random.Random(digest)
+
+        time.sleep(self._latency(rng, chars))
+
+        outcome = rng.random()
+        if outcome < self.rate_limit_rate:
+            raise TTSRateLimitError("Local TTS: rate limit exceeded (simulated 429)")
+        if outcome < self.rate_limit_rate + self.failure_rate:
+            raise Exception("Local TTS: synthesis failed (simulated error)")
+
+    def _latency(self, rng: random.Random, chars: int) -> float:
+        mean = self.latency_base + self.latency_per_char * chars
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "constant":
+            return mean
+        if self.latency_distribution == "uniform":
+            return rng.uniform(0, 2 * mean)
+        # Lognormal with the requested mean
+        return rng.lognormvariate(
+            np.log(mean) - self.latency_sigma**2 / 2, self.latency_sigma
+        )
+
+    def _render(self, text: str, speaker: str) -> bytes:
+        words = max(len(text.split()), 1)
+        duration = words / self.words_per_minute * 60
+        t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+
+        pitch = self.speaker_configs[speaker].pitch_hz
+        voice = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 5))
+        syllables = np.clip(np.sin(2 * np.pi * 4.0 * t), 0, None)
+        return (voice * syllables * 6000).astype(np.int16).tobytes()
+
+    def synthesize(self, text: str, speaker: str) -> bytes:
+        """Simulate a synthesis request and return raw PCM."""
+        self._simulate_request(f"{speaker}:{text}", len(text))
+        return self._render(text, speaker)
+
+    def synthesize_turns(
+        self,
+        turns: List[Tuple[str, str]],
+        pause_ms: int = TURN_PAUSE_MS,
+        pauses: Optional[List[int]] = None,
+    ) -> bytes:
+        """Synthesize several turns as a single simulated request."""
+        key = "|".join(f"{speaker}:{text}" for speaker, text in turns)
+        self._simulate_request(key, sum(len(text) for _, text in turns))
+
+        audio = bytearray()
+        for idx, (speaker, text) in enumerate(turns):
+            if idx:
+                gap = pause_ms if pauses is None else pauses[idx]
+                audio.extend(bytes(pause_bytes(gap)))
+            audio.extend(self._render(text, speaker))
+        return bytes(audio)
@@ -0,0 +1,58 @@
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from src.components.podcast.assembler import TURN_PAUSE_MS
+
+# Azure limits a single SSML request to 50 voice elements and roughly ten
+# minutes of output audio; the character budget keeps batches well below both.
+MAX_SSML_VOICES = 50
+MAX_SSML_TEXT_CHARS = 8000
+
+
+def build_ssml(
+    turns: List[Tuple[str, str]],
+    speaker_configs: Dict,
+    pause_ms: int = TURN_PAUSE_MS,
+    pauses: Optional[List[int]] = None,
+) -> str:
+    """Render (speaker, text) turns as one multi-voice SSML document.
+
+    ``pauses[i]`` overrides the break inserted before turn ``i``.
+    """
+    voices = []
+    for idx, (speaker, text) in enumerate(turns):
+        config = speaker_configs[speaker]
+        gap = pause_ms if pauses is None else pauses[idx]
+        pause = f'<break time="{gap}ms"/>' if idx and gap else ""
+        voices.append(
+            f"<voice name={quoteattr(config.voice_name)}>{pause}"
+            f"<mstts:express-as style={quoteattr(config.style)} "
+            f'styledegree="{config.style_degree}">'
+            f"{escape(text)}</mstts:express-as></voice>"
+        )
+
+    return (
+        '<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+        'xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">'
+        f"{''.join(voices)}</speak>"
+    )
+
+
+def pack_ssml_batches(
+    turns: List[Tuple[str, str]],
+    max_voices: int = MAX_SSML_VOICES,
+    max_chars: int = MAX_SSML_TEXT_CHARS,
+) -> List[List[int]]:
+    """Group consecutive turn indices into batches that fit one SSML request."""
+    batches = []
+    current, chars = [], 0
+    for idx, (_, text) in enumerate(turns):
+        if current and (len(current) >= max_voices or chars + len(text) > max_chars):
+            batches.append(current)
+            current, chars = [], 0
+        current.append(idx)
+        chars += len(text)
+
+    if current:
+        batches.append(current)
+    return batches
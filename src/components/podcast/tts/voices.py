@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class AzureSpeakerConfig:
+    voice_name: str
+    style: str = "chat"
+    style_degree: float = 1.0
+
+
+@dataclass
+class ElevenLabsSpeakerConfig:
+    voice_id: str
+    model_id: str = "eleven_monolingual_v1"
+    stability: float = 0.5
+    similarity_boost: float = 0.75
+    style: float = 0.0
+    use_speaker_boost: bool = True
+
+
+AZURE_SPEAKER_CONFIGS = {
+    "Host": AzureSpeakerConfig(voice_name="en-US-JasonNeural", style="chat"),
+    "Learner": AzureSpeakerConfig(voice_name="en-US-JennyNeural", style="friendly"),
+    "Expert": AzureSpeakerConfig(voice_name="en-US-GuyNeural", style="professional"),
+}
+
+
+@dataclass
+class LocalSpeakerConfig:
+    pitch_hz: float
+
+
+ELEVEN_LABS_SPEAKER_CONFIGS = {
+    "Host": ElevenLabsSpeakerConfig(
+        voice_id="cjVigY5qzO86Huf0OWal",
+        stability=0.75,
+        similarity_boost=0.75,
+        style=0.35,
+        use_speaker_boost=True,
+    ),
+    "Learner": ElevenLabsSpeakerConfig(
+        voice_id="cgSgspJ2msm6clMCkdW9",
+        stability=0.65,
+        similarity_boost=0.70,
+        style=0.45,
+        use_speaker_boost=True,
+    ),
+    "Expert": ElevenLabsSpeakerConfig(
+        voice_id="onwK4e9ZLuTAKqWW03F9",
+        stability=0.85,
+        similarity_boost=0.80,
+        style=0.25,
+        use_speaker_boost=True,
+    ),
+}
+
+LOCAL_SPEAKER_CONFIGS = {
+    "Host": LocalSpeakerConfig(pitch_hz=125.0),
+    "Learner": LocalSpeakerConfig(pitch_hz=210.0),
+    "Expert": LocalSpeakerConfig(pitch_hz=100.0),
+}
@@ -1,10 +1,21 @@
-from typing import Dict, List
+import json
+import logging
+from typing import Dict, List, Optional
 
 from src.components.base import BaseComponent
 from src.models.types import PostContent
-from src.prompts.summary import SUMMARY_PROMPT
-from src.utils.formatting import format_comments
-from src.utils.urls import extract_urls, format_url_content, is_valid_url
+from src.prompts.summary import BATCH_SUMMARY_POST, BATCH_SUMMARY_PROMPT, SUMMARY_PROMPT
+from src.utils.cache import make_cache_key
+from src.utils.context import (
+    BODY,
+    COMMENT,
+    URL_EXCERPT,
+    PackedContext,
+    count_tokens,
+    pack_posts,
+    report_prompt,
+)
+from src.utils.urls import extract_urls, is_valid_url
 
 
 class RedditPostFetcher(BaseComponent):
@@ -22,19 +33,90 @@ class RedditPostFetcher(BaseComponent):
             limit=limit,
         )
 
+    async def afetch_top_posts(
+        self,
+        subreddit: str,
+        flair_filter: str = "Answered",
+        time_filter: str = "week",
+        limit: int = 10,
+    ) -> List[Dict]:
+        return await self.reddit_service.aget_top_posts(
+            subreddit,
+            flair_filter=flair_filter,
+            time_filter=time_filter,
+            limit=limit,
+        )
+
 
 class RedditPostProcessor(BaseComponent):
-    def _generate_summary(self, post: Dict, url_content: Dict[str, str]) -> str:
+    # Token budget for the post, comments and URL excerpts in a summary prompt
+    context_tokens = 4000
+    # Parallel URL fetches when processing several posts (sync path)
+    fetch_workers = 8
+
+    def _summary_prompt(self, post: Dict, url_content: Dict[str, str]) -> str:
+        packed = self._pack_post(post, url_content)
         prompt = SUMMARY_PROMPT.format(
             title=post["title"],
-            content=post["selftext"],
-            url_content=format_url_content(url_content),
-            comments=format_comments(post["comments"]),
+            content=packed.section(0, BODY),
+            url_content=packed.section(0, URL_EXCERPT, "\n\n"),
+            comments=packed.section(0, COMMENT),
         )
-        return self.openai_service.generate_completion(prompt)
+        report_prompt(f"Summary '{post['title'][:40]}'", prompt, packed)
+        return prompt
 
-    def process_post(self, post: Dict) -> PostContent:
-        """Process a single post and its related content."""
+    def _pack_post(self, post: Dict, url_content: Dict[str, str]) -> PackedContext:
+        return pack_posts(
+            [{**post, "url_content": url_content}],
+            self.context_tokens,
+            include_body=True,
+        )
+
+    def _batch_summary_prompt(
+        self, posts: List[Dict], url_contents: List[Dict[str, str]]
+    ) -> str:
+        """One structured prompt asking for a summary of each post by id."""
+        parts = []
+        for post_id, (post, url_content) in enumerate(zip(posts, url_contents), 1):
+            packed = self._pack_post(post, url_content)
+            parts.append(
+                BATCH_SUMMARY_POST.format(
+                    id=post_id,
+                    title=post["title"],
+                    content=packed.section(0, BODY),
+                    url_content=packed.section(0, URL_EXCERPT, "\n\n"),
+                    comments=packed.section(0, COMMENT),
+                )
+            )
+        prompt = BATCH_SUMMARY_PROMPT.format(posts="\n".join(parts))
+        print(
+            f"Batch summary prompt: {count_tokens(prompt)} tokens, {len(posts)} posts"
+        )
+        return prompt
+
+    @staticmethod
+    def _parse_batch_summaries(
+        response: Optional[str], count: int
+    ) -> List[Optional[str]]:
+        """Per-post summaries from a batch response; missing ones are None."""
+        summaries: List[Optional[str]] = [None] * count
+        if response is None:
+            return summaries
+        try:
+            entries = json.loads(response)["summaries"]
+            for entry in entries:
+                idx = int(entry["id"]) - 1
+                if 0 <= idx < count and entry.get("summary"):
+                    summaries[idx] = str(entry["summary"])
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Could not parse batch summary response: {str(e)}")
+        return summaries
+
+    def _generate_summary(self, post: Dict, url_content: Dict[str, str]) -> str:
+        prompt = self._summary_prompt(post, url_content)
+        return self.openai_service.generate_completion(prompt, stage="summary")
+
+    def _collect_urls(self, post: Dict) -> List[str]:
         urls = extract_urls(post["selftext"])
         if post["url"] and is_valid_url(post["url"]):
             urls.append(post["url"])
@@ -42,12 +124,108 @@ class RedditPostProcessor(BaseComponent):
         for comment in post["comments"]:
             urls.extend(extract_urls(comment["body"]))
 
-        urls = list(set(filter(is_valid_url, urls)))
+        # Deduplicate in order of appearance; set order varies with the hash
+        # seed and would make prompts (and their cache keys) differ per process
+        return list(dict.fromkeys(filter(is_valid_url, urls)))
+
+    def process_post(self, post: Dict) -> PostContent:
+        """Process a single post and its related content."""
+        urls = self._collect_urls(post)
         url_content = self.firecrawl_service.process_urls_batch(urls)
 
         summary = self._generate_summary(post, url_content)
 
+        return self._post_content(post, urls, url_content, summary)
+
+    def process_posts(
+        self,
+        posts: List[Dict],
+        batch_size: int = 5,
+        batch_job: bool = False,
+        poll_interval: float = 60.0,
+    ) -> List[PostContent]:
+        """Process posts, summarizing ``batch_size`` posts per completion.
+
+        With ``batch_job`` the summary requests are submitted as one offline
+        batch job and polled until it finishes. Posts whose summary is missing
+        from a response are summarized individually.
+        """
+        urls = [self._collect_urls(post) for post in posts]
+        url_contents = self._fetch_url_contents(urls)
+
+        groups = [
+            list(range(start, min(start + batch_size, len(posts))))
+            for start in range(0, len(posts), max(batch_size, 1))
+        ]
+        structured = batch_size > 1
+        stage = "batch_summary" if structured else "summary"
+        options = {"response_format": {"type": "json_object"}} if structured else {}
+        prompts = [
+            (
+                self._batch_summary_prompt(
+                    [posts[idx] for idx in group], [url_contents[idx] for idx in group]
+                )
+                if structured
+                else self._summary_prompt(posts[group[0]], url_contents[group[0]])
+            )
+            for group in groups
+        ]
+
+        if batch_job:
+            responses = self.openai_service.run_batch(
+                prompts, poll_interval=poll_interval, stage=stage, **options
+            )
+        else:
+            responses = [
+                self.openai_service.generate_completion(prompt, stage=stage, **options)
+                for prompt in prompts
+            ]
+
+        summaries: List[Optional[str]] = []
+        for group, response in zip(groups, responses):
+            if structured:
+                summaries.extend(self._parse_batch_summaries(response, len(group)))
+            else:
+                summaries.append(response)
+
+        processed = []
+        for post, post_urls, url_content, summary in zip(
+            posts, urls, url_contents, summaries
+        ):
+            if summary is None:
+                logging.warning(f"No batch summary for '{post['title']}', retrying")
+                summary = self._generate_summary(post, url_content)
+            processed.append(self._post_content(post, post_urls, url_content, summary))
+        return processed
+
+    def _fetch_url_contents(self, urls: List[List[str]]) -> List[Dict[str, str]]:
+        """Fetch the URLs of all posts concurrently, each distinct URL once."""
+        unique = list(dict.fromkeys(url for post_urls in urls for url in post_urls))
+        content = self.firecrawl_service.process_urls_parallel(
+            unique, max_workers=self.fetch_workers
+        )
+        return [
+            {url: content[url] for url in post_urls if url in content}
+            for post_urls in urls
+        ]
+
+    async def aprocess_post(self, post: Dict) -> PostContent:
+        """Async variant of process_post; the post's URLs are fetched concurrently."""
+        urls = self._collect_urls(post)
+        url_content = await self.firecrawl_service.aprocess_urls_batch(urls)
+
+        summary = await self.openai_service.agenerate_completion(
+            self._summary_prompt(post, url_content), stage="summary"
+        )
+
+        return self._post_content(post, urls, url_content, summary)
+
+    def _post_content(
+        self, post: Dict, urls: List[str], url_content: Dict[str, str], summary: str
+    ) -> PostContent:
         return PostContent(
+            # Posts recorded without an id get a stable one from their title
+            id=post.get("id") or make_cache_key(post["title"])[:8],
             title=post["title"],
             selftext=post["selftext"],
             url=post["url"],
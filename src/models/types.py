@@ -1,8 +1,9 @@
 from operator import add
-from typing import Annotated, Dict, List, TypedDict
+from typing import Annotated, Dict, List, Optional, TypedDict
 
 
 class PostContent(TypedDict):
+    id: str
     title: str
     selftext: str
     url: str
@@ -12,15 +13,27 @@ class PostContent(TypedDict):
     summary: str
 
 
+class PostRef(TypedDict):
+    """A processed post in workflow state; the post itself is an artifact."""
+
+    id: str
+    title: str
+    # ArtifactStore key of the full PostContent
+    key: str
+
+
 class Section(TypedDict):
     title: str
     points: List[str]
+    # Id of the processed post the section covers
+    post_id: Optional[str]
 
 
 class ProcessingState(TypedDict):
     subreddit: str
-    posts: List[Dict]
-    processed_posts: Annotated[List[PostContent], add]
+    # ArtifactStore keys of the fetched posts
+    posts: List[str]
+    processed_posts: Annotated[List[PostRef], add]
     script_plan: str
     sections: List[Section]
     introduction: str
@@ -68,3 +68,48 @@ Original Script:
 {script}
 
 Return the enhanced script with natural dialogue and smooth transitions:"""
+
+SECTION_ENHANCEMENT_PROMPT = """You are a very clever scriptwriter of podcast discussions. You will be given one section
+of an "Out of the Loop" podcast script that explains current events and internet phenomena, together
+with the end of the previous section and the start of the next one for context. Your task is to
+enhance ONLY the given section and format it properly.
+
+Requirements:
+1. Format each line as "Speaker: Dialogue text" (e.g., "Host: Hello everyone!")
+2. Remove any section headers, audio effects, stage directions, or descriptions
+3. Avoid repeating what the surrounding context already covers
+4. Make the dialogue flow naturally and engaging
+5. Keep only the actual spoken dialogue
+6. Maintain the distinct voices of the three speakers:
+   - Host: Professional and enthusiastic
+   - Learner: Curious and engaging
+   - Expert: Insightful and analytical
+
+End of the previous section (context only, do not rewrite):
+{previous}
+
+Section to enhance:
+{section}
+
+Start of the next section (context only, do not rewrite):
+{next}
+
+Return only the enhanced section:"""
+
+TRANSITION_PROMPT = """You are a very clever scriptwriter of podcast discussions. Below are the last lines of one
+section of an "Out of the Loop" podcast script and the first lines of the next section. Rewrite
+these lines so the conversation moves naturally from one topic to the next.
+
+Requirements:
+1. Format each line as "Speaker: Dialogue text" with Host, Learner or Expert as the speaker
+2. Keep the content and roughly the same number of lines
+3. Add a smooth, natural bridge between the two topics within the dialogue
+4. Keep only the actual spoken dialogue
+
+End of the section:
+{before}
+
+Start of the next section:
+{after}
+
+Return only the rewritten lines:"""
@@ -53,9 +53,10 @@ Here are some varied discussion patterns to mix and match:
 
 Posts to cover: {posts}
 
-Generate discussion plans in this exact markdown format. and Don't mention the patterns explicitly.:
+Generate discussion plans in this exact markdown format. and Don't mention the patterns explicitly.
+Start each heading with the ID of the post it covers, in square brackets:
 
-## [First OOTL Question/Title]
+## [Post ID] First OOTL Question/Title
 - Host introduces the main controversy/confusion point
 - Learner asks about [specific confusing aspect]
 - Expert explains the core context and background
@@ -64,8 +65,8 @@ Generate discussion plans in this exact markdown format. and Don't mention the p
 - Expert analyzes broader significance
 [Additional relevant bullet points as needed]
 
-## [Second OOTL Question/Title]
+## [Post ID] Second OOTL Question/Title
 [Same bullet point structure]
 
-## [Third OOTL Question/Title]
+## [Post ID] Third OOTL Question/Title
 [Same bullet point structure]"""
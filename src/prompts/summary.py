@@ -15,3 +15,29 @@ Provide a concise summary that captures:
 3. Important points from the discussion
 4. Why this topic is interesting/relevant
 """
+
+BATCH_SUMMARY_PROMPT = """Analyze each of the following Reddit posts and their related content.
+
+{posts}
+
+For each post, provide a concise summary that captures:
+1. The main question/topic
+2. Key information from related links
+3. Important points from the discussion
+4. Why this topic is interesting/relevant
+
+Respond with a JSON object of the form
+{{"summaries": [{{"id": <post id>, "summary": "<summary>"}}, ...]}}
+with exactly one entry per post id.
+"""
+
+BATCH_SUMMARY_POST = """=== Post {id} ===
+Title: {title}
+Content: {content}
+
+Related URLs content:
+{url_content}
+
+Top Comments:
+{comments}
+"""
@@ -1,22 +1,208 @@
+import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
+import openai
 from dotenv import load_dotenv
+from langchain_core.messages import AIMessage
 from langchain_openai import AzureChatOpenAI
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from src.utils.cache import DiskCache, make_cache_key
+from src.utils.cassette import (
+    CassetteMissError,
+    arecorded,
+    get_cassette,
+    recorded,
+    replaying,
+)
+from src.utils.context import count_tokens
+from src.utils.rate_limit import RateLimiter
+from src.utils.usage import current_recorder
+
+# Throttling and transient service/network failures are retried with backoff
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+# Errors meaning a deployment is saturated; stages with a fallback deployment
+# move there at once instead of backing off. A replay miss also moves on, for
+# completions recorded while the fallback was in use
+OVERLOAD_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+    CassetteMissError,
+)
+DEFAULT_TEMPERATURE = 0.7
+# Completion length assumed when max_tokens is unset; Azure counts the
+# requested completion length against the tokens-per-minute quota
+DEFAULT_COMPLETION_TOKENS = 1000
+
+# Completion caches and rate governors are process-wide, shared by every
+# service instance using the same directory or deployment
+_caches: Dict[str, DiskCache] = {}
+_governors: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def _get_cache(directory: str, max_mb: float, ttl_hours: Optional[float]) -> DiskCache:
+    with _shared_lock:
+        if directory not in _caches:
+            _caches[directory] = DiskCache(
+                directory,
+                max_bytes=int(max_mb * 1024 * 1024),
+                ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+            )
+        return _caches[directory]
+
+
+def get_governor(deployment: str) -> RateLimiter:
+    """Rate governor for a deployment's LLM_REQUESTS/TOKENS_PER_MINUTE quota."""
+    with _shared_lock:
+        if deployment not in _governors:
+            rpm = os.getenv("LLM_REQUESTS_PER_MINUTE")
+            tpm = os.getenv("LLM_TOKENS_PER_MINUTE")
+            _governors[deployment] = RateLimiter(
+                requests_per_minute=float(rpm) if rpm else None,
+                tokens_per_minute=float(tpm) if tpm else None,
+            )
+        return _governors[deployment]
+
+
+@dataclass(frozen=True)
+class StageRoute:
+    """Deployment and sampling settings for one pipeline stage's completions.
+
+    Unset fields fall back to AZURE_DEPLOYMENT, AZURE_FALLBACK_DEPLOYMENT,
+    DEFAULT_TEMPERATURE and an unlimited completion length.
+    """
+
+    deployment: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    # Deployment tried when the primary one is overloaded
+    fallback: Optional[str] = None
+
+
+def load_stage_routes() -> Dict[str, StageRoute]:
+    """Stage routes from LLM_STAGE_ROUTES, a JSON object of stage -> route fields.
+
+    A "default" entry applies to stages without their own route.
+    """
+    raw = os.getenv("LLM_STAGE_ROUTES")
+    if not raw:
+        return {}
+    try:
+        routes = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid LLM_STAGE_ROUTES: {str(e)}")
+    return {stage: StageRoute(**fields) for stage, fields in routes.items()}
+
+
+def _log_retry(retry_state) -> None:
+    logging.warning(
+        f"Completion attempt {retry_state.attempt_number} failed "
+        f"({retry_state.outcome.exception()}), retrying"
+    )
+
+
+_retry_transient = retry(
+    wait=wait_random_exponential(multiplier=1, min=1, max=60),
+    stop=stop_after_attempt(6),
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+
+def _encode_message(message: AIMessage) -> dict:
+    return {"content": message.content, "usage_metadata": message.usage_metadata}
+
+
+def _decode_message(data: dict) -> AIMessage:
+    return AIMessage(content=data["content"], usage_metadata=data["usage_metadata"])
 
 
 class OpenAIService:
-    """Service for interacting with Azure OpenAI API."""
+    """Service for interacting with Azure OpenAI API.
+
+    Completions can be cached on disk across runs. The cache is opt-in: pass
+    ``cache_dir`` or set LLM_CACHE_DIR. Entries expire after LLM_CACHE_TTL_HOURS
+    (if set), the directory is capped at LLM_CACHE_MAX_MB, and setting
+    LLM_CACHE_BYPASS=1 (or ``bypass_cache=True``) skips lookups for a fresh
+    run while still storing the new completions.
+
+    Prompts can also be submitted as an Azure OpenAI batch job (cheaper, with
+    results within the completion window) and polled until done. The job
+    uses AZURE_BATCH_DEPLOYMENT (a global-batch deployment, defaulting to
+    AZURE_DEPLOYMENT) at AZURE_OPENAI_ENDPOINT, which can point at a local
+    stand-in server.
+
+    Completions go through a process-wide governor per deployment that
+    queues calls to stay within LLM_REQUESTS_PER_MINUTE and
+    LLM_TOKENS_PER_MINUTE. Rate-limit and transient errors are retried with
+    jittered backoff.
+
+    Each stage can be routed to its own deployment, temperature and
+    max_tokens (see StageRoute and LLM_STAGE_ROUTES), e.g. to put the
+    high-volume summaries on a faster tier. When a stage's deployment is
+    overloaded the call moves to its fallback deployment before backing off.
 
-    def __init__(self):
-        self._model = self._setup_model()
+    With a record/replay cassette active (see src.utils.cassette) completions
+    are recorded or replayed and cache lookups are skipped, so every call
+    reaches the cassette.
+    """
 
-    def _setup_model(self) -> AzureChatOpenAI:
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        cache_max_mb: Optional[float] = None,
+        cache_ttl_hours: Optional[float] = None,
+        bypass_cache: Optional[bool] = None,
+        routes: Optional[Dict[str, StageRoute]] = None,
+    ):
+        self._models: Dict[str, Optional[AzureChatOpenAI]] = {}
+        self._models_lock = threading.Lock()
+        if replaying():
+            # Completions come from the cassette; no client or credentials
+            self.deployment = os.getenv("AZURE_DEPLOYMENT", "replay")
+        else:
+            model = self._setup_model()
+            self.deployment = model.deployment_name
+            self._models[self.deployment] = model
+        self.routes = load_stage_routes() if routes is None else routes
+        self.fallback_deployment = os.getenv("AZURE_FALLBACK_DEPLOYMENT")
+
+        cache_dir = cache_dir or os.getenv("LLM_CACHE_DIR")
+        self.cache = None
+        if cache_dir:
+            self.cache = _get_cache(
+                cache_dir,
+                cache_max_mb or float(os.getenv("LLM_CACHE_MAX_MB", 256)),
+                cache_ttl_hours or float(os.getenv("LLM_CACHE_TTL_HOURS", 0)),
+            )
+        if bypass_cache is None:
+            bypass_cache = os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true")
+        self.bypass_cache = bypass_cache or get_cassette() is not None
+        self._batch_client = None
+
+    def _setup_model(self, deployment: Optional[str] = None) -> AzureChatOpenAI:
         """Initialize Azure OpenAI model."""
         load_dotenv()
 
-        deployment = os.getenv("AZURE_DEPLOYMENT")
+        deployment = deployment or os.getenv("AZURE_DEPLOYMENT")
         api_version = os.getenv("AZURE_API_VERSION")
 
         if not all([deployment, api_version]):
@@ -25,24 +211,437 @@ class OpenAIService:
                 "and AZURE_API_VERSION are set in your .env file."
             )
 
+        # Retries are handled by the governor-aware _invoke instead
         return AzureChatOpenAI(
             azure_deployment=deployment,
             api_version=api_version,
+            max_retries=0,
+        )
+
+    def _model(self, deployment: str) -> Optional[AzureChatOpenAI]:
+        """Model client for deployment, created on first use (None on replay)."""
+        with self._models_lock:
+            if deployment not in self._models:
+                self._models[deployment] = (
+                    None if replaying() else self._setup_model(deployment)
+                )
+            return self._models[deployment]
+
+    def _route(
+        self,
+        stage: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Tuple[List[str], float, Optional[int]]:
+        """Deployments to try in order, temperature and max_tokens for a stage.
+
+        Explicit arguments take precedence over the stage's route.
+        """
+        route = self.routes.get(stage or "") or self.routes.get("default")
+        route = route or StageRoute()
+        deployments = [route.deployment or self.deployment]
+        fallback = route.fallback or self.fallback_deployment
+        if fallback and fallback not in deployments:
+            deployments.append(fallback)
+        if temperature is None:
+            temperature = route.temperature
+        if max_tokens is None:
+            max_tokens = route.max_tokens
+        if temperature is None:
+            temperature = DEFAULT_TEMPERATURE
+        return deployments, temperature, max_tokens
+
+    def _cache_key(
+        self,
+        deployment: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+    ) -> Optional[str]:
+        if not (self.cache and use_cache):
+            return None
+        return make_cache_key(deployment, prompt, temperature, max_tokens, kwargs)
+
+    def _cached(self, cache_key: Optional[str]) -> Optional[str]:
+        if not cache_key or self.bypass_cache:
+            return None
+        cached = self.cache.get(cache_key)
+        return cached.decode("utf-8") if cached is not None else None
+
+    def _store(self, cache_key: Optional[str], content: str) -> None:
+        if cache_key:
+            self.cache.put(cache_key, content.encode("utf-8"))
+
+    def _estimate_tokens(self, prompt: str, max_tokens: Optional[int]) -> int:
+        return count_tokens(str(prompt)) + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+    @staticmethod
+    def _settle(governor: RateLimiter, response: Any, estimate: int) -> None:
+        """Replace the reserved token estimate with the reported usage."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            governor.adjust_tokens(usage["total_tokens"] - estimate)
+
+    @staticmethod
+    def _back_off(governor: RateLimiter, error: openai.RateLimitError) -> None:
+        """Hold back every caller of this deployment for the server's Retry-After."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response else None
+        try:
+            governor.pause(float(retry_after))
+        except (TypeError, ValueError):
+            pass
+
+    def _invoke_on(
+        self, deployment: str, prompt: str, **params: Any
+    ) -> Tuple[Any, float]:
+        """Invoke deployment under its governor; returns the response and queue time."""
+        governor = get_governor(deployment)
+        estimate = self._estimate_tokens(prompt, params.get("max_tokens"))
+        queued = governor.acquire(estimate)
+        try:
+            response = recorded(
+                "llm",
+                (deployment, prompt, params),
+                lambda: self._model(deployment).invoke(prompt, **params),
+                encode=_encode_message,
+                decode=_decode_message,
+            )
+        except openai.RateLimitError as e:
+            self._back_off(governor, e)
+            raise
+        self._settle(governor, response, estimate)
+        return response, queued
+
+    async def _ainvoke_on(
+        self, deployment: str, prompt: str, **params: Any
+    ) -> Tuple[Any, float]:
+        governor = get_governor(deployment)
+        estimate = self._estimate_tokens(prompt, params.get("max_tokens"))
+        queued = await governor.aacquire(estimate)
+        try:
+            response = await arecorded(
+                "llm",
+                (deployment, prompt, params),
+                lambda: self._model(deployment).ainvoke(prompt, **params),
+                encode=_encode_message,
+                decode=_decode_message,
+            )
+        except openai.RateLimitError as e:
+            self._back_off(governor, e)
+            raise
+        self._settle(governor, response, estimate)
+        return response, queued
+
+    @_retry_transient
+    def _invoke(
+        self, deployments: List[str], prompt: str, **params: Any
+    ) -> Tuple[Any, float, str]:
+        """Invoke the first deployment that isn't overloaded.
+
+        Returns the response, queue time and the deployment that answered.
+        """
+        for deployment, fallback in zip(deployments, deployments[1:]):
+            try:
+                return (*self._invoke_on(deployment, prompt, **params), deployment)
+            except OVERLOAD_ERRORS as e:
+                logging.warning(f"{deployment} overloaded ({e}), trying {fallback}")
+        deployment = deployments[-1]
+        return (*self._invoke_on(deployment, prompt, **params), deployment)
+
+    @_retry_transient
+    async def _ainvoke(
+        self, deployments: List[str], prompt: str, **params: Any
+    ) -> Tuple[Any, float, str]:
+        for deployment, fallback in zip(deployments, deployments[1:]):
+            try:
+                response, queued = await self._ainvoke_on(deployment, prompt, **params)
+                return response, queued, deployment
+            except OVERLOAD_ERRORS as e:
+                logging.warning(f"{deployment} overloaded ({e}), trying {fallback}")
+        deployment = deployments[-1]
+        response, queued = await self._ainvoke_on(deployment, prompt, **params)
+        return response, queued, deployment
+
+    def _record(
+        self,
+        stage: Optional[str],
+        started: float,
+        deployment: str,
+        response: Any = None,
+        queued: float = 0.0,
+    ) -> None:
+        """Add the call to the current run's usage report, if one is active."""
+        recorder = current_recorder.get()
+        if recorder is None:
+            return
+        usage = getattr(response, "usage_metadata", None) or {}
+        recorder.record(
+            stage,
+            deployment,
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+            seconds=time.perf_counter() - started,
+            queued_seconds=queued,
+            cached=response is None,
         )
 
     def generate_completion(
         self,
         prompt: str,
-        temperature: float = 0.7,
+        temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        stage: Optional[str] = None,
         **kwargs: Dict[str, Any],
     ) -> str:
-        """Generate completion from prompt."""
+        """Generate completion from prompt, served from the cache when possible.
+
+        ``stage`` names the pipeline step the call is reported under and
+        selects its route; temperature and max_tokens override the route's.
+        """
+        started = time.perf_counter()
+        deployments, temperature, max_tokens = self._route(
+            stage, temperature, max_tokens
+        )
+        cache_key = self._cache_key(
+            deployments[0], prompt, temperature, max_tokens, use_cache, kwargs
+        )
+        cached = self._cached(cache_key)
+        if cached is not None:
+            self._record(stage, started, deployments[0])
+            return cached
+
         try:
-            response = self._model.invoke(
-                prompt, temperature=temperature, max_tokens=max_tokens, **kwargs
+            response, queued, deployment = self._invoke(
+                deployments,
+                prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
             )
-            return response.content
         except Exception as e:
             logging.error(f"Error generating completion: {str(e)}")
             raise
+
+        self._record(stage, started, deployment, response, queued)
+        self._store(cache_key, response.content)
+        return response.content
+
+    async def agenerate_completion(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        stage: Optional[str] = None,
+        **kwargs: Dict[str, Any],
+    ) -> str:
+        """Async variant of generate_completion using the model's ainvoke."""
+        started = time.perf_counter()
+        deployments, temperature, max_tokens = self._route(
+            stage, temperature, max_tokens
+        )
+        cache_key = self._cache_key(
+            deployments[0], prompt, temperature, max_tokens, use_cache, kwargs
+        )
+        cached = self._cached(cache_key)
+        if cached is not None:
+            self._record(stage, started, deployments[0])
+            return cached
+
+        try:
+            response, queued, deployment = await self._ainvoke(
+                deployments,
+                prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
+            )
+        except Exception as e:
+            logging.error(f"Error generating completion: {str(e)}")
+            raise
+
+        self._record(stage, started, deployment, response, queued)
+        self._store(cache_key, response.content)
+        return response.content
+
+    @property
+    def cache_stats(self) -> Optional[dict]:
+        """Hit/miss statistics of the completion cache, None when disabled."""
+        return self.cache.stats if self.cache else None
+
+    @property
+    def governor_stats(self) -> Dict[str, dict]:
+        """Calls and queue-wait time of the rate governor of each deployment used."""
+        with _shared_lock:
+            return {
+                deployment: governor.stats
+                for deployment, governor in _governors.items()
+            }
+
+    @property
+    def batch_deployment(self) -> str:
+        """Deployment batch jobs run on."""
+        return os.getenv("AZURE_BATCH_DEPLOYMENT", self.deployment)
+
+    def submit_batch(
+        self,
+        prompts: List[str],
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_tokens: Optional[int] = None,
+        **kwargs: Dict[str, Any],
+    ) -> str:
+        """Upload prompts as a batch job and return its id."""
+        from openai import AzureOpenAI
+
+        if self._batch_client is None:
+            self._batch_client = AzureOpenAI(api_version=os.getenv("AZURE_API_VERSION"))
+
+        deployment = self.batch_deployment
+        lines = []
+        for idx, prompt in enumerate(prompts):
+            body = {
+                "model": deployment,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": temperature,
+                **kwargs,
+            }
+            if max_tokens is not None:
+                body["max_tokens"] = max_tokens
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": str(idx),
+                        "method": "POST",
+                        "url": "/chat/completions",
+                        "body": body,
+                    }
+                )
+            )
+
+        batch_file = self._batch_client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = self._batch_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h",
+        )
+        logging.info(f"Submitted batch {batch.id} with {len(prompts)} requests")
+        return batch.id
+
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        num_prompts: int,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ) -> List[Optional[dict]]:
+        """Poll a batch job until it ends and return responses in prompt order.
+
+        Each response is the chat completion body, with the message under
+        ``choices`` and token counts under ``usage``. Requests that failed
+        inside the batch come back as None.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            batch = self._batch_client.batches.retrieve(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch_id} still {batch.status}")
+            time.sleep(poll_interval)
+
+        if not batch.output_file_id:
+            # A completed batch has no output file when every request failed
+            details = ""
+            if batch.error_file_id:
+                errors = self._batch_client.files.content(batch.error_file_id).text
+                details = (
+                    f": {errors.strip().splitlines()[0]}" if errors.strip() else ""
+                )
+            raise Exception(
+                f"Batch {batch_id} ended with status {batch.status} "
+                f"and no output{details}"
+            )
+
+        results: List[Optional[dict]] = [None] * num_prompts
+        output = self._batch_client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                logging.warning(
+                    f"Batch request {record.get('custom_id')} failed: "
+                    f"{record.get('error') or response}"
+                )
+                continue
+            results[int(record["custom_id"])] = response["body"]
+        return results
+
+    def run_batch(
+        self,
+        prompts: List[str],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        stage: Optional[str] = None,
+        **kwargs: Dict[str, Any],
+    ) -> List[Optional[str]]:
+        """Complete prompts through a batch job, skipping those already cached.
+
+        The stage's route sets temperature and max_tokens; the job itself
+        always runs on the batch deployment, which is also what its results
+        are cached and reported under.
+        """
+        started = time.perf_counter()
+        _, temperature, max_tokens = self._route(stage, temperature, max_tokens)
+        deployment = self.batch_deployment
+        results: List[Optional[str]] = []
+        cache_keys = []
+        for prompt in prompts:
+            cache_key = self._cache_key(
+                deployment, prompt, temperature, max_tokens, True, kwargs
+            )
+            cache_keys.append(cache_key)
+            results.append(self._cached(cache_key))
+            if results[-1] is not None:
+                self._record(stage, started, deployment)
+
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        batch_id = self.submit_batch(
+            [prompts[idx] for idx in pending], temperature, max_tokens, **kwargs
+        )
+        batch_started = time.perf_counter()
+        responses = self.wait_for_batch(
+            batch_id, len(pending), poll_interval=poll_interval, timeout=timeout
+        )
+        # The job's wall time is shared evenly between its requests
+        seconds = (time.perf_counter() - batch_started) / len(pending)
+        recorder = current_recorder.get()
+        for idx, response in zip(pending, responses):
+            if response is None:
+                continue
+            content = response["choices"][0]["message"]["content"]
+            self._store(cache_keys[idx], content)
+            results[idx] = content
+            if recorder is not None:
+                usage = response.get("usage") or {}
+                recorder.record(
+                    stage,
+                    deployment,
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    seconds=seconds,
+                    batch=True,
+                )
+        return results
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from typing import Dict, List
@@ -5,12 +6,15 @@ from typing import Dict, List
 import praw
 from dotenv import load_dotenv
 
+from src.utils.cassette import recorded, replaying
+
 
 class RedditService:
     """Service for interacting with Reddit API."""
 
     def __init__(self):
-        self._client = self._setup_client()
+        # Replayed runs are served from the cassette and need no credentials
+        self._client = None if replaying() else self._setup_client()
 
     def _setup_client(self) -> praw.Reddit:
         """Initialize Reddit client with credentials."""
@@ -40,6 +44,25 @@ class RedditService:
         max_comments_per_post: int = 3,
     ) -> List[Dict]:
         """Fetch top posts from specified subreddit."""
+        params = (
+            subreddit_name,
+            flair_filter,
+            time_filter,
+            sort_by,
+            limit,
+            max_comments_per_post,
+        )
+        return recorded("reddit", params, lambda: self._search_posts(*params))
+
+    def _search_posts(
+        self,
+        subreddit_name: str,
+        flair_filter: str,
+        time_filter: str,
+        sort_by: str,
+        limit: int,
+        max_comments_per_post: int,
+    ) -> List[Dict]:
         subreddit = self._client.subreddit(subreddit_name)
 
         search_query = f"flair:{flair_filter}" if flair_filter else ""
@@ -55,6 +78,13 @@ class RedditService:
             logging.error(f"Error fetching posts from r/{subreddit_name}: {str(e)}")
             raise
 
+    async def aget_top_posts(self, subreddit_name: str, **kwargs) -> List[Dict]:
+        """Async variant of get_top_posts.
+
+        praw is synchronous, so the fetch runs in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_top_posts, subreddit_name, **kwargs)
+
     def _format_post(self, post: praw.models.Submission, max_comments: int) -> Dict:
         """Format a Reddit post and its comments."""
         top_comments = []
@@ -73,6 +103,7 @@ class RedditService:
                 )
 
         return {
+            "id": post.id,
             "subreddit": str(post.subreddit),
             "title": post.title,
             "url": post.url,
@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import tempfile
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from src.utils.cache import make_cache_key
+
+
+class ArtifactStore:
+    """Content-addressed store for large pipeline payloads of one run.
+
+    Values are stored as JSON files named after the hash of their content,
+    so workflow state only needs to carry keys and each branch loads just
+    the artifacts it works on. Identical payloads are stored once. Nothing
+    is evicted while the run holds keys; the whole directory is deleted by
+    ``close`` (or on leaving the ``with`` block) once the run is over.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def for_run(cls, root: str) -> "ArtifactStore":
+        """A store in a fresh directory under root, private to one run."""
+        os.makedirs(root, exist_ok=True)
+        return cls(tempfile.mkdtemp(prefix="run_", dir=root))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def put(self, value: Any) -> str:
+        """Store a JSON-serializable value and return its key."""
+        key = make_cache_key(value)
+        path = self._path(key)
+        if not os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        return key
+
+    def get(self, key: str) -> Any:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Artifact {key} not found in {self.directory}") from None
+
+    def close(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> "ArtifactStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def stats(self) -> dict:
+        sizes = [entry.stat().st_size for entry in os.scandir(self.directory)]
+        return {"artifacts": len(sizes), "bytes": sum(sizes)}
+
+
+# Store of the pipeline run in progress; copied into node threads and tasks
+current_store: ContextVar[Optional[ArtifactStore]] = ContextVar(
+    "current_store", default=None
+)
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable content hash from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Persistent byte cache on the local filesystem with size-bounded LRU eviction.
+
+    Entries are stored one file per key. The modification time records when
+    an entry was written, for ``ttl_seconds`` expiry; recency is tracked
+    through the access time, which is refreshed on every hit.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path, _ in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _entries(self):
+        """Yield (path, last access time) for every stored entry."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    yield path, os.path.getatime(path)
+                except OSError:
+                    continue
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            written = os.path.getmtime(path)
+            if (
+                self.ttl_seconds is not None
+                and time.time() - written > self.ttl_seconds
+            ):
+                self._remove(path)
+                raise OSError(f"Cache entry expired: {key}")
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path, (time.time(), written))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under key, evicting least recently used entries if needed."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique temp file per write: the directory may be shared by
+        # threads of several processes writing the same key
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f"{key}.", suffix=".tmp", dir=os.path.dirname(path)
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """Drop the oldest entries until the cache fits in max_bytes."""
+        for path, _ in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self._size <= self.max_bytes:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._size -= size
+            except OSError as e:
+                logging.warning(f"Failed to evict cache entry {path}: {str(e)}")
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size_bytes": self._size,
+        }
@@ -0,0 +1,223 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.utils.cache import make_cache_key
+
+MODES = ("record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a call that was never recorded."""
+
+
+class Cassette:
+    """Records external service responses to disk and replays them offline.
+
+    In "record" mode each call routed through ``call``/``acall`` is executed
+    and its result appended to the cassette. In "replay" mode results are
+    served from the cassette without touching the service, after sleeping
+    for the recorded latency times ``latency_scale`` (0 replays instantly).
+    Calls that share a key are replayed in the order they were recorded.
+    Failed calls are never recorded, so retries replay as a single success.
+
+    A cassette is a directory holding calls.jsonl.gz, one gzip member per
+    call with its key, service, latency and JSON response, and a blobs/
+    folder with binary responses (audio) zlib-compressed under their hash.
+    """
+
+    def __init__(self, directory: str, mode: str, latency_scale: float = 0.0):
+        if mode not in MODES:
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._calls_path = os.path.join(directory, "calls.jsonl.gz")
+        self._blob_dir = os.path.join(directory, "blobs")
+        self._entries: Dict[str, List[dict]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+
+        if self.replaying:
+            self._load()
+        else:
+            os.makedirs(self._blob_dir, exist_ok=True)
+            # Recording always starts a fresh cassette
+            open(self._calls_path, "wb").close()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        if not os.path.exists(self._calls_path):
+            raise FileNotFoundError(f"No cassette recorded at {self.directory}")
+        with gzip.open(self._calls_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], []).append(entry)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, f"{digest}.z")
+
+    def _append(self, service: str, key: str, seconds: float, response: Any) -> None:
+        entry = {"key": key, "service": service, "seconds": round(seconds, 4)}
+        if isinstance(response, bytes):
+            digest = hashlib.sha256(response).hexdigest()
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self._blob_dir)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(zlib.compress(response))
+                os.replace(tmp_path, path)
+            entry["blob"] = digest
+        else:
+            entry["response"] = response
+
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            # Each append is its own gzip member; readers see one stream
+            with gzip.open(self._calls_path, "at", encoding="utf-8") as f:
+                f.write(line)
+            self.recorded += 1
+
+    def _next(self, service: str, key: str) -> dict:
+        """The next recorded entry for key, repeating the last once exhausted."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(
+                    f"No recorded {service} call matches this request "
+                    f"(cassette {self.directory}); record the run again"
+                )
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            self.replayed += 1
+            return entries[min(served, len(entries) - 1)]
+
+    def _response(self, entry: dict) -> Any:
+        if "blob" in entry:
+            with open(self._blob_path(entry["blob"]), "rb") as f:
+                return zlib.decompress(f.read())
+        return entry["response"]
+
+    def call(
+        self,
+        service: str,
+        key_parts: Any,
+        fn: Callable[[], Any],
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """Run fn (recording its result) or replay the result recorded for key_parts.
+
+        ``encode`` turns a result into bytes or JSON-serializable data for
+        the cassette and ``decode`` restores it on replay.
+        """
+        key = make_cache_key(service, key_parts)
+        if self.replaying:
+            entry = self._next(service, key)
+            if self.latency_scale:
+                time.sleep(entry["seconds"] * self.latency_scale)
+            response = self._response(entry)
+            return decode(response) if decode else response
+
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+        self._append(service, key, seconds, encode(result) if encode else result)
+        return result
+
+    async def acall(
+        self,
+        service: str,
+        key_parts: Any,
+        fn: Callable[[], Awaitable[Any]],
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """Async variant of call; fn returns the awaitable to record."""
+        key = make_cache_key(service, key_parts)
+        if self.replaying:
+            entry = self._next(service, key)
+            if self.latency_scale:
+                await asyncio.sleep(entry["seconds"] * self.latency_scale)
+            response = self._response(entry)
+            return decode(response) if decode else response
+
+        started = time.perf_counter()
+        result = await fn()
+        seconds = time.perf_counter() - started
+        await asyncio.to_thread(
+            self._append, service, key, seconds, encode(result) if encode else result
+        )
+        return result
+
+    @property
+    def stats(self) -> dict:
+        return {"mode": self.mode, "recorded": self.recorded, "replayed": self.replayed}
+
+
+_cassette: Optional[Cassette] = None
+_configured = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Process-wide cassette, configured from the environment on first use.
+
+    CASSETTE_MODE ("record" or "replay") enables it, CASSETTE_DIR picks the
+    directory (default ./cassettes/default) and CASSETTE_LATENCY_SCALE
+    scales the recorded latencies on replay (default 0, instant).
+    """
+    global _cassette, _configured
+    with _cassette_lock:
+        if not _configured:
+            mode = os.getenv("CASSETTE_MODE")
+            if mode:
+                _cassette = Cassette(
+                    os.getenv("CASSETTE_DIR", "./cassettes/default"),
+                    mode.lower(),
+                    float(os.getenv("CASSETTE_LATENCY_SCALE", 0)),
+                )
+            _configured = True
+        return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    """Record or replay through cassette from now on (None disables it)."""
+    global _cassette, _configured
+    with _cassette_lock:
+        _cassette = cassette
+        _configured = True
+
+
+def replaying() -> bool:
+    cassette = get_cassette()
+    return cassette is not None and cassette.replaying
+
+
+def recorded(service: str, key_parts: Any, fn: Callable[[], Any], **codec: Any) -> Any:
+    """Route a call through the active cassette, or just run fn without one."""
+    cassette = get_cassette()
+    if cassette is None:
+        return fn()
+    return cassette.call(service, key_parts, fn, **codec)
+
+
+async def arecorded(
+    service: str, key_parts: Any, fn: Callable[[], Awaitable[Any]], **codec: Any
+) -> Any:
+    cassette = get_cassette()
+    if cassette is None:
+        return await fn()
+    return await cassette.acall(service, key_parts, fn, **codec)
@@ -0,0 +1,208 @@
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.utils.cache import make_cache_key
+
+# Encoding used by the gpt-4o family; older deployments tokenize similarly
+# enough for budgeting purposes
+TOKEN_ENCODING = "o200k_base"
+# Approximate characters per token when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+# Excerpts are not truncated below this many tokens; they are dropped instead
+MIN_EXCERPT_TOKENS = 40
+
+# Fragment priorities, lowest first; higher ones are only packed into what is left
+TITLE, SUMMARY, BODY, COMMENT, URL_EXCERPT = range(5)
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder():
+    """tiktoken encoder, or None if tiktoken or its encoding file is unavailable."""
+    global _encoder, _encoder_loaded
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                import tiktoken
+
+                _encoder = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                logging.warning(
+                    f"tiktoken unavailable ({str(e)}), estimating tokens from length"
+                )
+            _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoder = _get_encoder()
+    if encoder is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    return encoder.decode(encoder.encode(text, disallowed_special=())[:max_tokens])
+
+
+@dataclass(frozen=True)
+class Fragment:
+    priority: int
+    text: str
+    tokens: int
+    # Post bodies and URL excerpts may be shortened to fit; other fragments
+    # are all or nothing
+    truncatable: bool = False
+
+
+def _fragment(priority: int, text: str, truncatable: bool = False) -> Fragment:
+    return Fragment(priority, text, count_tokens(text), truncatable)
+
+
+@dataclass
+class PostFragments:
+    title: Fragment
+    summary: Optional[Fragment]
+    body: Optional[Fragment]
+    comments: List[Fragment]
+    url_excerpts: List[Fragment]
+
+    def all(self) -> List[Fragment]:
+        fragments = [self.title, self.summary, self.body]
+        return [f for f in fragments if f] + self.comments + self.url_excerpts
+
+
+# Posts whose fragments are kept; a run packs the same few posts repeatedly
+FRAGMENT_CACHE_SIZE = 256
+
+_fragment_cache: "OrderedDict[str, PostFragments]" = OrderedDict()
+_fragment_lock = threading.Lock()
+
+
+def post_fragments(post: Dict) -> PostFragments:
+    """Render a post's prompt fragments and count their tokens, once per post.
+
+    Results are memoized on everything that is rendered, URL excerpts in
+    order included, for the FRAGMENT_CACHE_SIZE most recently used posts.
+    """
+    key = make_cache_key(
+        post["title"],
+        post.get("selftext"),
+        post.get("summary"),
+        post.get("comments", []),
+        list(post.get("url_content", {}).items()),
+    )
+    with _fragment_lock:
+        fragments = _fragment_cache.get(key)
+        if fragments is not None:
+            _fragment_cache.move_to_end(key)
+            return fragments
+
+    summary, body = post.get("summary"), post.get("selftext")
+    fragments = PostFragments(
+        title=_fragment(TITLE, post["title"]),
+        summary=_fragment(SUMMARY, summary) if summary else None,
+        body=_fragment(BODY, body, True) if body else None,
+        comments=[
+            _fragment(
+                COMMENT,
+                f"- {comment['author']} (Score: {comment['score']}): "
+                f"{comment['body']}",
+            )
+            for comment in post.get("comments", [])
+        ],
+        url_excerpts=[
+            _fragment(URL_EXCERPT, f"URL: {url}\nContent: {content}", True)
+            for url, content in post.get("url_content", {}).items()
+            if content
+        ],
+    )
+    with _fragment_lock:
+        _fragment_cache[key] = fragments
+        while len(_fragment_cache) > FRAGMENT_CACHE_SIZE:
+            _fragment_cache.popitem(last=False)
+    return fragments
+
+
+@dataclass
+class PackedContext:
+    budget: int
+    # Kept fragments per post, in their original order
+    posts: List[Dict[int, List[str]]] = field(default_factory=list)
+    tokens: int = 0
+    dropped: int = 0
+    truncated: int = 0
+
+    def section(self, post_idx: int, priority: int, separator: str = "\n") -> str:
+        return separator.join(self.posts[post_idx].get(priority, []))
+
+    def describe(self) -> str:
+        return (
+            f"{self.tokens}/{self.budget} tokens, "
+            f"{self.truncated} truncated, {self.dropped} dropped"
+        )
+
+
+def pack_posts(
+    posts: List[Dict], budget: int, include_body: bool = False
+) -> PackedContext:
+    """Select post fragments that fit ``budget`` tokens, by priority.
+
+    Every post's title goes in first, then every summary, then comments and
+    URL excerpts, taken round-robin across posts. A fragment that doesn't
+    fit is skipped, except that bodies and URL excerpts are shortened to an
+    even share of the space left, but never below MIN_EXCERPT_TOKENS.
+    """
+    packed = PackedContext(budget=budget, posts=[{} for _ in posts])
+    candidates = []
+    for post_idx, post in enumerate(posts):
+        ranks: Dict[int, int] = {}
+        for fragment in post_fragments(post).all():
+            if fragment.priority == BODY and not include_body:
+                continue
+            rank = ranks[fragment.priority] = ranks.get(fragment.priority, -1) + 1
+            candidates.append((fragment.priority, rank, post_idx, fragment))
+
+    candidates.sort(key=lambda c: c[:3])
+    left_in_tier = {}
+    for priority, *_ in candidates:
+        left_in_tier[priority] = left_in_tier.get(priority, 0) + 1
+
+    kept = []
+    for priority, rank, post_idx, fragment in candidates:
+        # Truncatable fragments get at most an even share of what is left
+        allowance = budget - packed.tokens
+        if fragment.truncatable:
+            share = allowance // left_in_tier[priority]
+            allowance = min(allowance, max(share, MIN_EXCERPT_TOKENS))
+        left_in_tier[priority] -= 1
+
+        text, tokens = fragment.text, fragment.tokens
+        if tokens > allowance:
+            if not fragment.truncatable or allowance < MIN_EXCERPT_TOKENS:
+                packed.dropped += 1
+                continue
+            # Leave room for the ellipsis, which may not merge into the last token
+            text = truncate_to_tokens(text, allowance - 2) + "…"
+            tokens = count_tokens(text)
+            packed.truncated += 1
+        packed.tokens += tokens
+        kept.append((post_idx, rank, priority, text))
+
+    for post_idx, _, priority, text in sorted(kept):
+        packed.posts[post_idx].setdefault(priority, []).append(text)
+    return packed
+
+
+def report_prompt(stage: str, prompt: str, packed: PackedContext) -> None:
+    print(
+        f"{stage} prompt: {count_tokens(prompt)} tokens (context {packed.describe()})"
+    )
@@ -1,5 +1,7 @@
 from typing import Dict, List
 
+from src.utils.context import COMMENT, SUMMARY, URL_EXCERPT, PackedContext
+
 
 def format_comments(comments: List[Dict]) -> str:
     """Format comments for prompts."""
@@ -11,21 +13,23 @@ def format_comments(comments: List[Dict]) -> str:
     )
 
 
-def format_posts_for_script(posts: List[Dict]) -> str:
-    """Format processed posts for script generation."""
+def format_posts_for_script(posts: List[Dict], packed: PackedContext) -> str:
+    """Format processed posts for script generation from their packed fragments."""
     formatted = []
     for i, post in enumerate(posts, 1):
+        url_excerpts = packed.section(i - 1, URL_EXCERPT, "\n\n")
         formatted.append(
             f"""
         Post {i}:
+        ID: {post['id']}
         Title: {post['title']}
-        Summary: {post['summary']}
+        Summary: {packed.section(i - 1, SUMMARY)}
 
         Key Points from Related Content:
-        {post.get('url_content', 'No additional content available')}
+        {url_excerpts or 'No additional content available'}
 
         Notable Discussion:
-        {format_comments(post.get('comments', []))}
+        {packed.section(i - 1, COMMENT)}
 
         ---
         """
@@ -33,6 +37,22 @@ def format_posts_for_script(posts: List[Dict]) -> str:
     return "\n".join(formatted)
 
 
+def format_post_context(post: Dict, packed: PackedContext) -> str:
+    """Format the packed context of a single post for dialogue prompts."""
+    url_excerpts = packed.section(0, URL_EXCERPT, "\n\n")
+    return f"""
+            Relevant Context:
+            Title: {post['title']}
+            Summary: {packed.section(0, SUMMARY)}
+
+            Key URLs and their content:
+            {url_excerpts}
+
+            Top Comments:
+            {packed.section(0, COMMENT)}
+            """
+
+
 def format_url_content(url_content: Dict[str, str]) -> str:
     """Format URL content for prompts."""
     formatted = []
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to stay under per-minute quotas.
+
+    Requests are spaced evenly to respect ``requests_per_minute``. With
+    ``tokens_per_minute`` each call also reserves its estimated token cost;
+    up to ``burst_seconds`` worth of tokens may be spent at once before calls
+    are queued. Reservations are made up front, so callers are released in
+    order, and the time each caller spends queued is recorded.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        burst_seconds: float = 10.0,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+        self._interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._token_interval = 60.0 / tokens_per_minute if tokens_per_minute else 0.0
+        self._next_slot = 0.0
+        # Time at which the tokens reserved so far will have been "paid off"
+        self._tokens_paid_at = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _reserve(self, tokens: int = 0) -> float:
+        """Reserve the next free slot and return how long the caller must wait."""
+        with self._lock:
+            self.calls += 1
+            # Without quotas only a pause() can push the next slot out
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if self._token_interval:
+                slot = max(slot, self._tokens_paid_at - self.burst_seconds)
+                paid_from = max(self._tokens_paid_at, slot)
+                self._tokens_paid_at = paid_from + tokens * self._token_interval
+            self._next_slot = slot + self._interval
+
+            delay = slot - now
+            self.total_wait += delay
+            self.max_wait = max(self.max_wait, delay)
+            return delay
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until a request may be issued. Returns the time spent waiting."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Async variant of acquire that waits without blocking the event loop."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def adjust_tokens(self, delta: int) -> None:
+        """Correct an earlier reservation once the actual token count is known."""
+        if self._token_interval and delta:
+            with self._lock:
+                self._tokens_paid_at += delta * self._token_interval
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds``, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_wait_s": round(self.total_wait, 3),
+            "mean_wait_s": round(self.total_wait / self.calls, 3)
+            if self.calls
+            else 0.0,
+            "max_wait_s": round(self.max_wait, 3),
+        }
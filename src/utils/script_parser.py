@@ -1,10 +1,33 @@
-from typing import Dict, List
+import logging
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
 
 from src.models.types import Section
 
+# "## [post id] Title" headings emitted by the planner
+HEADING_ID = re.compile(r"^\[([^\]]+)\]\s*(.*)$")
 
-def parse_script_plan(content: str) -> List[Section]:
-    """Parse the script plan content into structured sections."""
+# Line separating sections in the final script
+SECTION_BREAK = "---"
+SECTION_BREAK_LINE = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+
+
+def split_sections(script: str) -> List[str]:
+    """Split a script at its section break lines; without any it is one section."""
+    return SECTION_BREAK_LINE.split(script)
+
+
+def parse_script_plan(
+    content: str, posts: Optional[List[Dict]] = None
+) -> List[Section]:
+    """Parse the script plan content into structured sections.
+
+    Each section keeps the post id from its heading. With ``posts`` given,
+    ids are checked against them and sections without a valid one are bound
+    to the post with the closest title.
+    """
+    known_ids = {post["id"] for post in posts} if posts is not None else None
     sections = []
     current_section = None
     lines = [line.strip() for line in content.splitlines() if line.strip()]
@@ -14,7 +37,8 @@ def parse_script_plan(content: str) -> List[Section]:
             if current_section:
                 sections.append(current_section)
 
-            current_section = {"title": line.lstrip("#").strip(), "points": []}
+            title, post_id = _parse_heading(line.lstrip("#").strip(), known_ids)
+            current_section = {"title": title, "points": [], "post_id": post_id}
 
         elif line.startswith("-"):
             if current_section:
@@ -23,4 +47,70 @@ def parse_script_plan(content: str) -> List[Section]:
     if current_section:
         sections.append(current_section)
 
+    if posts is not None:
+        bind_sections(sections, posts)
     return sections
+
+
+def _parse_heading(heading: str, known_ids: Optional[set]) -> Tuple[str, Optional[str]]:
+    match = HEADING_ID.match(heading)
+    # A bracketed title with spaces is not an id; leave the heading alone
+    if not match or " " in match.group(1).strip():
+        return heading, None
+    post_id, title = match.group(1).strip(), match.group(2).strip() or heading
+    if known_ids is not None and post_id not in known_ids:
+        return title, None
+    return title, post_id
+
+
+def _title_words(title: str) -> List[str]:
+    return re.findall(r"\w+", title.lower())
+
+
+def bind_sections(sections: List[Section], posts: List[Dict]) -> None:
+    """Bind every section without a known post id to the closest-titled post.
+
+    Titles are compared word by word, best matches first, and posts not yet
+    covered by another section are preferred, so a paraphrased title still
+    gets its own post's context.
+    """
+    known_ids = {post["id"] for post in posts}
+    unbound = [section for section in sections if section["post_id"] not in known_ids]
+    if not (unbound and posts):
+        return
+
+    bound = {section["post_id"] for section in sections} & known_ids
+    candidates = sorted(
+        (
+            (
+                SequenceMatcher(
+                    None, _title_words(section["title"]), _title_words(post["title"])
+                ).ratio(),
+                section_idx,
+                post_idx,
+            )
+            for section_idx, section in enumerate(unbound)
+            for post_idx, post in enumerate(posts)
+        ),
+        reverse=True,
+    )
+    # First pass binds to uncovered posts only; the second lets leftover
+    # sections share a post
+    for allow_covered in (False, True):
+        for _, section_idx, post_idx in candidates:
+            section, post = unbound[section_idx], posts[post_idx]
+            if section["post_id"] in known_ids:
+                continue
+            if post["id"] in bound and not allow_covered:
+                continue
+            logging.warning(
+                f"Plan section '{section['title']}' has no valid post id, "
+                f"bound to '{post['title']}' by title"
+            )
+            section["post_id"] = post["id"]
+            bound.add(post["id"])
+
+
+def index_posts(posts: List[Dict]) -> Dict[str, Dict]:
+    """Map post ids to posts, for constant-time lookup from plan sections."""
+    return {post["id"]: post for post in posts}
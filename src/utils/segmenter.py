@@ -0,0 +1,82 @@
+import math
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"')\]]))\s+")
+CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:—])\s+")
+
+
+@dataclass
+class Turn:
+    speaker: str
+    text: str
+    # True when this chunk continues the previous chunk of the same turn
+    continuation: bool = False
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split text into chunks of at most max_chars at the nicest boundary available."""
+    if len(text) <= max_chars:
+        return [text]
+
+    for boundary in (SENTENCE_BOUNDARY, CLAUSE_BOUNDARY, re.compile(r"\s+")):
+        pieces = [piece for piece in boundary.split(text) if piece]
+        if len(pieces) > 1:
+            break
+    else:
+        # No whitespace at all; fall back to a hard cut
+        return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_long(piece, max_chars))
+        elif current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def segment_turns(
+    turns: List[Tuple[str, str]], min_chars: int = 40, max_chars: int = 600
+) -> List[Turn]:
+    """Reshape dialogue turns so every synthesis request lands in a size band.
+
+    Adjacent fragments by the same speaker are coalesced, and turns longer
+    than max_chars are split at sentence boundaries (falling back to clauses,
+    then words) into evenly sized continuation chunks.
+    """
+    merged: List[Turn] = []
+    for speaker, text in turns:
+        text = " ".join(text.split())
+        if not text:
+            continue
+        if merged and merged[-1].speaker == speaker:
+            merged[-1].text = f"{merged[-1].text} {text}"
+        else:
+            merged.append(Turn(speaker, text))
+
+    segments: List[Turn] = []
+    for turn in merged:
+        # Aim for evenly sized chunks rather than full chunks plus a short tail
+        parts = math.ceil(len(turn.text) / max_chars)
+        chunks = _split_long(turn.text, math.ceil(len(turn.text) / parts))
+        if (
+            len(chunks) > 1
+            and len(chunks[-1]) < min_chars
+            and len(chunks[-2]) + 1 + len(chunks[-1]) <= max_chars
+        ):
+            chunks[-2:] = [f"{chunks[-2]} {chunks[-1]}"]
+
+        for idx, chunk in enumerate(chunks):
+            segments.append(Turn(turn.speaker, chunk, continuation=idx > 0))
+    return segments
@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Batch jobs are billed at a discount to synchronous completions
+BATCH_COST_FACTOR = 0.5
+
+
+@dataclass
+class CompletionRecord:
+    stage: str
+    deployment: str
+    prompt_tokens: int
+    completion_tokens: int
+    seconds: float
+    queued_seconds: float
+    cost_usd: float
+    cached: bool = False
+    batch: bool = False
+
+
+def load_deployment_prices() -> Dict[str, Tuple[float, float]]:
+    """Per-deployment prices from LLM_DEPLOYMENT_PRICES.
+
+    The variable holds a JSON object of deployment -> {"prompt": ...,
+    "completion": ...}, in USD per million tokens.
+    """
+    raw = os.getenv("LLM_DEPLOYMENT_PRICES")
+    if not raw:
+        return {}
+    try:
+        prices = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid LLM_DEPLOYMENT_PRICES: {str(e)}")
+    return {
+        deployment: (float(price.get("prompt", 0)), float(price.get("completion", 0)))
+        for deployment, price in prices.items()
+    }
+
+
+class UsageRecorder:
+    """Collects per-completion usage for one pipeline run, grouped by stage.
+
+    Each completion is priced by the deployment that served it, so stages
+    routed to other deployments (or that fell back to one) are costed
+    correctly. Prices come from ``deployment_prices`` or
+    LLM_DEPLOYMENT_PRICES; deployments without one use LLM_PROMPT_COST_PER_1M
+    and LLM_COMPLETION_COST_PER_1M (USD per million tokens) unless given
+    explicitly. Without prices every cost is reported as 0.
+    """
+
+    def __init__(
+        self,
+        prompt_cost_per_1m: Optional[float] = None,
+        completion_cost_per_1m: Optional[float] = None,
+        deployment_prices: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        self.prompt_cost_per_1m = prompt_cost_per_1m or float(
+            os.getenv("LLM_PROMPT_COST_PER_1M", 0)
+        )
+        self.completion_cost_per_1m = completion_cost_per_1m or float(
+            os.getenv("LLM_COMPLETION_COST_PER_1M", 0)
+        )
+        self.deployment_prices = (
+            load_deployment_prices() if deployment_prices is None else deployment_prices
+        )
+        self.records: List[CompletionRecord] = []
+        self._lock = threading.Lock()
+
+    def prices(self, deployment: str) -> Tuple[float, float]:
+        """Prompt and completion price of a deployment, per million tokens."""
+        return self.deployment_prices.get(
+            deployment, (self.prompt_cost_per_1m, self.completion_cost_per_1m)
+        )
+
+    def record(
+        self,
+        stage: Optional[str],
+        deployment: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        seconds: float = 0.0,
+        queued_seconds: float = 0.0,
+        cached: bool = False,
+        batch: bool = False,
+    ) -> CompletionRecord:
+        prompt_price, completion_price = self.prices(deployment)
+        cost = (
+            prompt_tokens * prompt_price + completion_tokens * completion_price
+        ) / 1_000_000
+        if batch:
+            cost *= BATCH_COST_FACTOR
+
+        record = CompletionRecord(
+            stage=stage or "other",
+            deployment=deployment,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            seconds=seconds,
+            queued_seconds=queued_seconds,
+            cost_usd=cost,
+            cached=cached,
+            batch=batch,
+        )
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def by_stage(self) -> Dict[str, dict]:
+        """Totals per stage, in the order stages were first seen."""
+        with self._lock:
+            records = list(self.records)
+
+        stages: Dict[str, dict] = {}
+        for record in records:
+            totals = stages.setdefault(
+                record.stage,
+                {
+                    "calls": 0,
+                    "cached_calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "queued_seconds": 0.0,
+                    "cost_usd": 0.0,
+                    "deployments": [],
+                },
+            )
+            totals["calls"] += 1
+            totals["cached_calls"] += record.cached
+            totals["prompt_tokens"] += record.prompt_tokens
+            totals["completion_tokens"] += record.completion_tokens
+            totals["seconds"] += record.seconds
+            totals["max_seconds"] = max(totals["max_seconds"], record.seconds)
+            totals["queued_seconds"] += record.queued_seconds
+            totals["cost_usd"] += record.cost_usd
+            if record.deployment not in totals["deployments"]:
+                totals["deployments"].append(record.deployment)
+        return stages
+
+    def describe(self) -> str:
+        lines = [
+            f"{'stage':<18} {'calls':>5} {'prompt':>8} {'compl.':>7} "
+            f"{'seconds':>8} {'cost $':>8}"
+        ]
+        for stage, totals in self.by_stage().items():
+            lines.append(
+                f"{stage:<18} {totals['calls']:>5} {totals['prompt_tokens']:>8} "
+                f"{totals['completion_tokens']:>7} {totals['seconds']:>8.1f} "
+                f"{totals['cost_usd']:>8.4f}"
+            )
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> str:
+        with self._lock:
+            calls = [asdict(record) for record in self.records]
+        report = {"stages": self.by_stage(), "calls": calls}
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+    def write_prometheus(self, path: str) -> str:
+        """Write per-stage totals in the Prometheus text exposition format."""
+        metrics = [
+            ("llm_calls_total", "counter", "Completions", "calls"),
+            ("llm_cached_calls_total", "counter", "Cache hits", "cached_calls"),
+            ("llm_prompt_tokens_total", "counter", "Prompt tokens", "prompt_tokens"),
+            (
+                "llm_completion_tokens_total",
+                "counter",
+                "Completion tokens",
+                "completion_tokens",
+            ),
+            ("llm_latency_seconds_total", "counter", "Wall time", "seconds"),
+            ("llm_queue_seconds_total", "counter", "Rate-limit wait", "queued_seconds"),
+            ("llm_cost_usd_total", "counter", "Estimated cost", "cost_usd"),
+        ]
+        stages = self.by_stage()
+        lines = []
+        for name, kind, description, key in metrics:
+            lines.append(f"# HELP {name} {description} per pipeline stage")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, totals in stages.items():
+                lines.append(f'{name}{{stage="{stage}"}} {totals[key]}')
+
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def write_reports(self, directory: str) -> List[str]:
+        """Write llm_usage.json and llm_usage.prom into directory."""
+        os.makedirs(directory, exist_ok=True)
+        return [
+            self.write_json(os.path.join(directory, "llm_usage.json")),
+            self.write_prometheus(os.path.join(directory, "llm_usage.prom")),
+        ]
+
+
+# Recorder of the pipeline run in progress; copied into node threads and tasks
+current_recorder: ContextVar[Optional[UsageRecorder]] = ContextVar(
+    "current_recorder", default=None
+)